@@ -1,8 +1,9 @@
 import streamlit as st
 
-from core.config import PAGE_TITLE, PEOPLE
-from core.data import load_data
+from core.config import DEFAULT_PEOPLE, PAGE_TITLE
+from core.query import load_backend
 from core.metrics import discipline_order
+from core import profiling, roster
 from core.pages.comparison import render_comparison_page
 from core.pages.evolution import render_evolution_page
 
@@ -10,14 +11,19 @@ from core.pages.evolution import render_evolution_page
 
 st.set_page_config(page_title=PAGE_TITLE, layout="wide")
 
-df = load_data()
+# Profilage optionnel : MIF_PROFILE=1 ou ?profile=1
+profiling.start_run()
+
+# Couche de requêtes (pandas en mémoire par défaut, ou Arrow sur le fichier, cf. core.query)
+with profiling.span("load_data"):
+    backend = load_backend()
 
 # =========================
 # Sidebar filters
 # =========================
 st.sidebar.title("Filtres")
 
-disciplines = sorted([x for x in df["discipline"].dropna().unique()], key=discipline_order)
+disciplines = sorted(backend.distinct("discipline"), key=discipline_order)
 
 year_start, year_end = st.sidebar.slider(
     "Années",
@@ -34,18 +40,23 @@ discipline_sel = [
     if st.sidebar.checkbox(d, value=True, key=f"disc_{d}")
 ]
 
-# --- Personnes : boutons cliquables (checkbox) ---
-people_list = [p for p in PEOPLE if p in set(df["person"].dropna().unique())]
+# --- Personnes : liste avec recherche (effectif chargé depuis les données, cf. core.roster) ---
+people_list = roster.ordered(backend.distinct("person"))
 st.sidebar.subheader("Personnes")
-people_sel = [
-    p for p in people_list
-    if st.sidebar.checkbox(p, value=True, key=f"person_{p}")
-]
+people_sel = roster.ordered(
+    st.sidebar.multiselect(
+        "Personnes",
+        people_list,
+        default=people_list[:DEFAULT_PEOPLE],
+        key="people_sel",
+        label_visibility="collapsed",
+        placeholder="Rechercher une personne",
+    )
+)
 
-f = df.copy()
-f = f[(f["season_num"] >= year_start) & (f["season_num"] <= year_end)]
-f = f[f["discipline"].isin(discipline_sel)]
-f = f[f["person"].isin(people_sel)]
+# Filtrage par le backend (index (personne, discipline, saison) en pandas), mémorisé par état des filtres
+with profiling.span("filtres"):
+    f = backend.select((year_start, year_end), discipline_sel, people_sel)
 
 page = st.sidebar.radio("Page", ["Comparaison", "Évolution"])
 
@@ -53,13 +64,18 @@ st.title(PAGE_TITLE)
 
 if f.empty:
     st.warning("Aucun résultat avec ces filtres.")
+    profiling.render_panel(profiling.finish_run())
     st.stop()
 
 # =========================
 # Pages
 # =========================
 if page == "Comparaison":
-    render_comparison_page(f, discipline_sel=discipline_sel)
+    with profiling.span("page.comparaison"):
+        render_comparison_page(f, discipline_sel=discipline_sel)
 
 else:
-    render_evolution_page(f, discipline_sel=discipline_sel)
+    with profiling.span("page.evolution"):
+        render_evolution_page(f, discipline_sel=discipline_sel)
+
+profiling.render_panel(profiling.finish_run())
@@ -0,0 +1,77 @@
+"""
+course_order : ancienne construction (chaîne course_id + drop_duplicates + merge)
+contre factorisation en une passe sur le cadre trié.
+
+    python -m benchmarks.bench_course_order --rows 1000000 3000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_results
+from core.data import COURSE_SORT, row_keys, derive_columns
+from core.ingest import COURSE_KEY
+
+
+def course_order_merge(df: pd.DataFrame) -> pd.DataFrame:
+    """Ancienne implémentation (référence)."""
+    df = df.copy()
+    df["course_id"] = (
+        df["season"].astype(str)
+        + " | "
+        + df["discipline"].astype(str)
+        + "-"
+        + df["event"].astype(str)
+        + " | "
+        + df["pdf_file"].astype(str)
+    )
+    course_order = (
+        df[["course_id", "season_num", "event_num", "discipline_ord", "event_suf", "pdf_file"]]
+        .drop_duplicates()
+        .reset_index(drop=True)
+    )
+    course_order["course_order"] = range(len(course_order))
+    return df.merge(course_order[["course_id", "course_order"]], on="course_id", how="left")
+
+
+def course_order_factorize(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["course_order"] = pd.factorize(row_keys(*(df[c] for c in COURSE_KEY)))[0]
+    return df
+
+
+def _measure(func, df: pd.DataFrame) -> tuple[float, float, np.ndarray]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = func(df)
+    dt = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dt, peak / 2**20, out["course_order"].to_numpy()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 3_000_000])
+    args = parser.parse_args()
+
+    print(f"{'lignes':>10} {'méthode':>11} {'temps (s)':>10} {'pic alloc (Mo)':>15}")
+    for n in args.rows:
+        df = make_results(n)[["season", "discipline", "event", "pdf_file", "medal"]]
+        df["season_num"] = pd.to_numeric(df["season"], errors="coerce")
+        derive_columns(df)
+        df = df.sort_values(COURSE_SORT, ignore_index=True)[COURSE_KEY + COURSE_SORT[:-1]]
+
+        results = {}
+        for name, func in (("merge", course_order_merge), ("factorize", course_order_factorize)):
+            dt, peak, order = _measure(func, df)
+            results[name] = order
+            print(f"{n:>10} {name:>11} {dt:>10.3f} {peak:>15.1f}")
+        assert np.array_equal(results["merge"], results["factorize"])
+
+
+if __name__ == "__main__":
+    main()
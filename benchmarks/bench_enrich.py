@@ -0,0 +1,62 @@
+"""
+Avant/après pour les colonnes dérivées de load_data (Series.apply ligne à ligne
+contre évaluation par valeur distincte).
+
+    python -m benchmarks.bench_enrich --rows 1000000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_results
+from core.data import derive_columns
+from core.metrics import (
+    discipline_order,
+    parse_event_number,
+    medal_score_new,
+    medal_simple,
+    medal_label_discipline,
+    medal_label_merged,
+)
+
+DERIVED = ["discipline_ord", "event_num", "event_suf", "medal_score_new", "medal_simple", "medal_label", "medal_label_merged"]
+
+
+def derive_columns_rowwise(df: pd.DataFrame) -> None:
+    """Ancienne implémentation (référence)."""
+    df["discipline_ord"] = df["discipline"].apply(discipline_order)
+
+    ev_num, ev_suf = zip(*df["event"].apply(parse_event_number))
+    df["event_num"] = ev_num
+    df["event_suf"] = ev_suf
+
+    df["medal_score_new"] = df["medal"].apply(medal_score_new)
+    df["medal_simple"] = df["medal"].apply(medal_simple)
+    df["medal_label"] = df.apply(lambda r: medal_label_discipline(r["discipline"], r["medal"]), axis=1)
+    df["medal_label_merged"] = df["medal"].apply(medal_label_merged)
+
+
+def _timed(func, df: pd.DataFrame) -> tuple[float, pd.DataFrame]:
+    out = df.copy()
+    t0 = time.perf_counter()
+    func(out)
+    return time.perf_counter() - t0, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'lignes':>10} {'apply (s)':>10} {'unique (s)':>11} {'gain':>7}")
+    for n in args.rows:
+        raw = make_results(n)[["discipline", "event", "medal"]]
+        t_old, old = _timed(derive_columns_rowwise, raw)
+        t_new, new = _timed(derive_columns, raw)
+        pd.testing.assert_frame_equal(old[DERIVED], new[DERIVED], check_dtype=False)
+        print(f"{n:>10} {t_old:>10.3f} {t_new:>11.3f} {t_old / t_new:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Rapport mémoire de la table enrichie : octets par ligne, colonne par colonne,
+avant (object/int64) et après compact_results (category, entiers étroits).
+
+    python -m benchmarks.bench_memory --rows 1000000
+"""
+import argparse
+
+import pandas as pd
+
+from benchmarks.synthetic import make_results
+from core.config import RESULT_COLUMNS
+from core.data import enrich_results
+
+
+def bytes_per_row(df: pd.DataFrame) -> pd.Series:
+    return df.memory_usage(deep=True, index=False) / max(1, len(df))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="taille de l'archive brute")
+    parser.add_argument("--athletes", type=int, default=40)
+    args = parser.parse_args()
+
+    raw = make_results(args.rows, n_athletes=args.athletes)
+    raw = raw.loc[raw["person"].notna(), RESULT_COLUMNS]
+
+    before = bytes_per_row(enrich_results(raw, compact=False))
+    after = bytes_per_row(enrich_results(raw, compact=True))
+
+    report = pd.DataFrame({"avant (o/ligne)": before, "après (o/ligne)": after}).round(1)
+    report.loc["TOTAL"] = report.sum()
+    print(f"{len(raw)} lignes enrichies")
+    print(report.to_string())
+    print(f"gain : {before.sum() / after.sum():.1f}x")
+
+
+if __name__ == "__main__":
+    main()
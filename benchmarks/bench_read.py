@@ -0,0 +1,85 @@
+"""
+Lecture de l'archive : read_parquet + filtre pandas contre read_results
+(filtre `person` et projection poussés dans pyarrow). Chaque mesure tourne
+dans un processus neuf pour que le pic RSS soit comparable.
+
+    python -m benchmarks.bench_read --rows 1000000
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+
+from benchmarks.synthetic import make_results, write_results
+
+
+def _read_full(path: str) -> int:
+    import pandas as pd
+
+    from core.config import PEOPLE
+
+    df = pd.read_parquet(path)
+    return len(df[df["person"].isin(PEOPLE)])
+
+
+def _read_pushdown(path: str) -> int:
+    from core.data import read_results
+
+    return len(read_results(path))
+
+
+def _peak_rss_kb() -> int:
+    # ru_maxrss survit à exec() (hérité du parent) : on préfère VmHWM quand il existe
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(target, path: str, queue) -> None:
+    import pandas  # noqa: F401  (imports hors mesure)
+    import pyarrow.dataset  # noqa: F401
+
+    rss0 = _peak_rss_kb()
+    t0 = time.perf_counter()
+    n = target(path)
+    queue.put((n, time.perf_counter() - t0, _peak_rss_kb() - rss0))
+
+
+def _run(target, path: str) -> tuple[int, float, int]:
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(target, path, queue))
+    proc.start()
+    out = queue.get()
+    proc.join()
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--row-group-size", type=int, default=64_000)
+    args = parser.parse_args()
+
+    print(f"{'lignes':>10} {'tri':>7} {'lecture':>10} {'gardées':>8} {'temps (s)':>10} {'pic RSS (Mo)':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            df = make_results(n)
+            for sort_by in (None, ["person"]):
+                path = os.path.join(tmp, f"results_{n}_{bool(sort_by)}.parquet")
+                write_results(path, df, row_group_size=args.row_group_size, sort_by=sort_by)
+                for name, target in (("complète", _read_full), ("pushdown", _read_pushdown)):
+                    kept, dt, rss = _run(target, path)
+                    tri = "person" if sort_by else "-"
+                    print(f"{n:>10} {tri:>7} {name:>10} {kept:>8} {dt:>10.3f} {rss / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Suite de benchmarks headless : génère des archives synthétiques, puis mesure
+le chargement (lecture + enrichissement), le filtrage et le rendu des deux pages
+(Streamlit AppTest, sans navigateur). Sortie JSON, comparable d'un run à l'autre.
+Les pages sont mesurées à froid (caches de core.memo vidés avant chaque rendu)
+et à chaud (sections "<page>.warm", caches déjà remplis par un rendu précédent).
+Chaque section de page note les succès et échecs de chaque cache nommé
+(core.memo.cache_stats) sur l'ensemble de ses exécutions.
+
+    python -m benchmarks.run --rows 10000 100000 1000000 --out bench.json
+    python -m benchmarks.run --compare avant.json apres.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic import athlete_names, make_results, write_results
+
+
+def measure(sections: dict, name: str, func, repeat: int = 1, reset=None):
+    """
+    Temps mur (meilleur de `repeat` exécutions, sans traçage) puis pic d'allocation
+    mesuré sur une exécution séparée sous tracemalloc, qui ralentit fortement le code.
+    Les buffers Arrow (lecture parquet, chaînes) ne passent pas par tracemalloc.
+    `reset` est appelé avant chaque exécution (ex. vider les caches : mesure à froid).
+    """
+    walls = []
+    for _ in range(max(1, repeat)):
+        if reset is not None:
+            reset()
+        t0 = time.perf_counter()
+        out = func()
+        walls.append(time.perf_counter() - t0)
+
+    if reset is not None:
+        reset()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    sections[name] = {"wall_s": round(min(walls), 6), "peak_mb": round(peak / 2**20, 3)}
+    return out
+
+
+class _SpanCollector(logging.Handler):
+    """Récupère les spans exportés en logs JSON par core.profiling."""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.spans: dict[str, float] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        span = json.loads(record.getMessage())
+        if span["event"] != "span":
+            return
+        # meilleur temps par section sur les exécutions répétées
+        self.spans[span["name"]] = min(span["ms"], self.spans.get(span["name"], float("inf")))
+
+
+def _page_script(frame_path: str, page: str) -> None:
+    # Exécuté par AppTest comme un script Streamlit autonome
+    import pandas as pd
+
+    from core import profiling
+    from core.pages.comparison import render_comparison_page
+    from core.pages.evolution import render_evolution_page
+
+    profiling.start_run()
+    f = pd.read_pickle(frame_path)
+    disciplines = [d for d in f["discipline"].dropna().unique()]
+    if page == "comparison":
+        render_comparison_page(f, discipline_sel=disciplines)
+    else:
+        render_evolution_page(f, discipline_sel=disciplines)
+    profiling.finish_run()
+
+
+def _cache_delta(before: dict, after: dict) -> dict:
+    """Succès et échecs de chaque cache entre deux relevés de cache_stats."""
+    return {
+        name: {k: stats[k] - before.get(name, {}).get(k, 0) for k in ("hits", "misses")}
+        for name, stats in after.items()
+    }
+
+
+def render_page(frame_path: str, page: str, timeout: float) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_function(_page_script, args=(frame_path, page), default_timeout=timeout)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].value}")
+
+
+def bench_one(n_rows: int, args, tmp: str) -> dict:
+    from core.data import enrich_results, read_results
+    from core.filters import FilterIndex
+
+    athletes = athlete_names(args.athletes)
+    path = os.path.join(tmp, f"results_{n_rows}.parquet")
+    write_results(
+        path,
+        make_results(
+            n_rows,
+            n_athletes=args.athletes,
+            n_seasons=args.seasons,
+            disciplines=tuple(args.disciplines),
+            field_size=args.field_size,
+            seed=args.seed,
+        ),
+        sort_by=["person"],
+    )
+
+    sections: dict = {}
+    raw = measure(sections, "read", lambda: read_results(path, people=athletes), args.repeat)
+    df = measure(sections, "enrich", lambda: enrich_results(raw), args.repeat)
+    f = measure(
+        sections,
+        "filter",
+        lambda: FilterIndex(df).select((0, 9999), args.disciplines, athletes),
+        args.repeat,
+    )
+
+    frame_path = os.path.join(tmp, f"filtered_{n_rows}.pkl")
+    f.to_pickle(frame_path)
+    # Détail par section des pages : spans de core.profiling (MIF_PROFILE)
+    from core.memo import cache_stats, clear_caches
+    from core.profiling import PROFILE_ENV, logger
+
+    # Le frame picklé garde sa clé de filtre (f.attrs) et AppTest tourne dans ce
+    # processus : sans vider core.memo, les répétitions mesureraient le cache.
+    os.environ[PROFILE_ENV] = "1"
+    for page in ("comparison", "evolution"):
+        for name, reset in ((page, clear_caches), (f"{page}.warm", None)):
+            if reset is None:
+                render_page(frame_path, page, args.timeout)  # remplit les caches
+            collector = _SpanCollector()
+            logger.addHandler(collector)
+            before = cache_stats()
+            try:
+                measure(sections, name, lambda: render_page(frame_path, page, args.timeout), args.repeat, reset)
+            finally:
+                logger.removeHandler(collector)
+            sections[name]["spans_ms"] = collector.spans
+            sections[name]["cache"] = _cache_delta(before, cache_stats())
+
+    return {
+        "rows": n_rows,
+        "rows_loaded": len(df),
+        "rows_filtered": len(f),
+        # à froid uniquement (les sections .warm redoublent les pages)
+        "total_wall_s": round(sum(s["wall_s"] for k, s in sections.items() if not k.endswith(".warm")), 6),
+        "sections": sections,
+    }
+
+
+def run(args) -> dict:
+    import streamlit
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "streamlit": streamlit.__version__,
+            "athletes": args.athletes,
+            "seasons": args.seasons,
+            "disciplines": args.disciplines,
+            "field_size": args.field_size,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        # Échauffement : imports (plotly, pages) et démarrage d'AppTest hors mesure
+        warmup = argparse.Namespace(**{**vars(args), "repeat": 1})
+        bench_one(2_000, warmup, tmp)
+
+        for n in args.rows:
+            report["results"].append(bench_one(n, args, tmp))
+            print(f"{n} lignes : {report['results'][-1]['total_wall_s']:.2f}s", file=sys.stderr)
+    return report
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """Ratios temps / mémoire section par section entre deux rapports JSON."""
+    with open(before_path) as fh:
+        before = {r["rows"]: r for r in json.load(fh)["results"]}
+    with open(after_path) as fh:
+        after = {r["rows"]: r for r in json.load(fh)["results"]}
+
+    print(f"{'lignes':>10} {'section':>16} {'avant (s)':>10} {'après (s)':>10} {'x':>6} {'Mo avant':>9} {'Mo après':>9}")
+    for n in sorted(set(before) & set(after)):
+        b, a = before[n]["sections"], after[n]["sections"]
+        for name in [s for s in b if s in a]:
+            ratio = b[name]["wall_s"] / a[name]["wall_s"] if a[name]["wall_s"] else float("inf")
+            print(
+                f"{n:>10} {name:>16} {b[name]['wall_s']:>10.3f} {a[name]['wall_s']:>10.3f} {ratio:>6.2f}"
+                f" {b[name]['peak_mb']:>9.1f} {a[name]['peak_mb']:>9.1f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--athletes", type=int, default=4)
+    parser.add_argument("--seasons", type=int, default=18)
+    parser.add_argument("--disciplines", nargs="+", default=["Flèche", "Chamois"])
+    parser.add_argument("--field-size", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="exécutions chronométrées par section")
+    parser.add_argument("--timeout", type=float, default=600, help="délai max d'un rendu de page (s)")
+    parser.add_argument("--out", help="fichier JSON (stdout par défaut)")
+    parser.add_argument("--compare", nargs=2, metavar=("AVANT", "APRES"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Générateur d'archives synthétiques compatibles avec results.parquet.
+
+    python -m benchmarks.synthetic out.parquet --rows 1000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.config import PEOPLE
+
+STATIONS = ["Les Karellis", "Valloire", "Chamrousse", "Les 7 Laux", "Autrans", "Villard-de-Lans"]
+MEDALS_BY_DISCIPLINE = {
+    "Flèche": ["Rien", "Fléchette", "Bronze", "Argent", "Vermeil", "Or"],
+    "Chamois": ["Rien", "Cabri", "Bronze", "Argent", "Vermeil", "Or"],
+}
+MEDAL_SCORE = {"Rien": 0.0, "Fléchette": 1.0, "Cabri": 1.0, "Bronze": 2.0, "Argent": 3.0, "Vermeil": 3.5, "Or": 4.0}
+STATUSES = np.array(["FINISHED", "DNS", "DNF", "DSQ"])
+STATUS_P = [0.93, 0.04, 0.029, 0.001]
+CATEGORIES = np.array(["BEN", "MIN", "CAD", "JUN", "SEN", "MA1", "MA2"])
+
+
+def athlete_names(n_athletes: int) -> list[str]:
+    """Les personnes suivies de core.config, complétées par des noms générés."""
+    names = list(PEOPLE[:n_athletes])
+    names += [f"Athlète {i:03d}" for i in range(len(names), n_athletes)]
+    return names
+
+
+def make_results(
+    n_rows: int,
+    n_athletes: int = len(PEOPLE),
+    n_seasons: int = 18,
+    disciplines: tuple[str, ...] = ("Flèche", "Chamois"),
+    field_size: int = 60,
+    first_season: int = 2009,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Feuilles de résultats complètes : `field_size` concurrents par course, dont au plus
+    un par athlète suivi (colonne `person`), les autres restant anonymes (person = NA).
+    """
+    rng = np.random.default_rng(seed)
+    athletes = athlete_names(n_athletes)
+    n_courses = max(1, -(-n_rows // field_size))
+
+    # --- Courses ---
+    c_season = first_season + rng.integers(0, n_seasons, n_courses)
+    c_disc = np.asarray(disciplines, dtype=object)[rng.integers(0, len(disciplines), n_courses)]
+    c_event = rng.integers(1, 7, n_courses)
+    c_suffix = np.where(rng.random(n_courses) < 0.05, "b", "")
+    c_station = np.asarray(STATIONS, dtype=object)[rng.integers(0, len(STATIONS), n_courses)]
+    c_day = rng.integers(0, 90, n_courses)
+    c_date = pd.to_datetime(c_season.astype(str) + "-01-01") + pd.to_timedelta(c_day, unit="D")
+    c_owner = np.asarray(athletes, dtype=object)[rng.integers(0, len(athletes), n_courses)]
+
+    c_event_txt = pd.Series(c_event.astype(str)) + c_suffix
+    c_pdf = (
+        pd.Series(c_season.astype(str)) + "_" + pd.Series(c_station).str.replace(" ", "-")
+        + "_" + pd.Series(c_disc) + "-" + c_event_txt + "_" + pd.Series(c_owner) + "_" + pd.Series(np.arange(n_courses).astype(str))
+        + ".pdf"
+    )
+
+    # --- Lignes ---
+    course = np.repeat(np.arange(n_courses), field_size)[:n_rows]
+    rank = (np.arange(len(course)) % field_size) + 1
+    participants = np.bincount(course, minlength=n_courses)[course]
+
+    # Chaque athlète suivi court au plus une fois par course, à un rang aléatoire
+    person = np.full(len(course), None, dtype=object)
+    present = rng.random((n_courses, len(athletes))) < min(1.0, 0.5 * 4 / max(1, len(athletes)))
+    for a_idx, name in enumerate(athletes):
+        cs = np.flatnonzero(present[:, a_idx])
+        if cs.size == 0:
+            continue
+        pos = cs * field_size + rng.integers(0, field_size, cs.size)
+        pos = pos[pos < len(course)]
+        person[pos] = name
+
+    status = STATUSES[rng.choice(len(STATUSES), len(course), p=STATUS_P)]
+    finished = status == "FINISHED"
+    time_s = np.round(25.0 + rank * rng.uniform(0.2, 0.6, len(course)), 2)
+    pt = np.where(finished, np.round((rank - 1) * 2.5 + rng.uniform(0, 5, len(course)), 2), np.nan)
+
+    disc_rows = c_disc[course]
+    medal_idx = np.clip(5 - (rank - 1) * 6 // field_size, 0, 5)
+    medal_idx = np.where(finished, medal_idx, 0)
+    medal = np.where(
+        disc_rows == "Chamois",
+        np.asarray(MEDALS_BY_DISCIPLINE["Chamois"], dtype=object)[medal_idx],
+        np.asarray(MEDALS_BY_DISCIPLINE["Flèche"], dtype=object)[medal_idx],
+    )
+
+    birth_year = rng.integers(1960, 2015, len(course))
+    cat = CATEGORIES[rng.integers(0, len(CATEGORIES), len(course))]
+
+    return pd.DataFrame(
+        {
+            "season": c_season[course].astype(str),
+            "station": c_station[course],
+            "discipline": disc_rows,
+            "event": c_event_txt.to_numpy()[course],
+            "event_date": c_date.strftime("%d/%m/%Y").to_numpy()[course],
+            "pdf_file": c_pdf.to_numpy()[course],
+            "rank": rank.astype("int64"),
+            "participants_count": participants.astype("int64"),
+            "rank_relative": rank / participants,
+            "bib": np.nan,
+            "code": np.char.add("ESF", rng.integers(10**9, 10**10, len(course)).astype(str)),
+            "name_raw": np.char.add("NOM ", rank.astype(str)),
+            "person": person,
+            "birth_year": birth_year.astype("int64"),
+            "sex": np.where(rng.random(len(course)) < 0.5, "M", "F"),
+            "category_raw": cat,
+            "category_std": cat,
+            "time_raw": np.char.mod("%.2f", time_s),
+            "time_seconds": time_s,
+            "status": status,
+            "pt_cse": pt,
+            "medal": medal,
+            "medal_score": pd.Series(medal).map(MEDAL_SCORE).to_numpy(),
+            "tags": c_owner[course],
+        }
+    )
+
+
+def write_results(path: str, df: pd.DataFrame, row_group_size: int = 128_000, sort_by: list[str] | None = None) -> None:
+    """`sort_by=["person"]` regroupe les athlètes suivis : les statistiques de row group deviennent sélectives."""
+    if sort_by:
+        df = df.sort_values(sort_by, kind="stable", na_position="last")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, row_group_size=row_group_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--athletes", type=int, default=len(PEOPLE))
+    parser.add_argument("--seasons", type=int, default=18)
+    parser.add_argument("--disciplines", default="Flèche,Chamois")
+    parser.add_argument("--field-size", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sort-by", default="", help="colonnes de tri, ex. person")
+    args = parser.parse_args()
+
+    df = make_results(
+        args.rows,
+        n_athletes=args.athletes,
+        n_seasons=args.seasons,
+        disciplines=tuple(args.disciplines.split(",")),
+        field_size=args.field_size,
+        seed=args.seed,
+    )
+    write_results(args.out, df, sort_by=[c for c in args.sort_by.split(",") if c])
+    print(f"{len(df)} lignes -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
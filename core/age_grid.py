@@ -0,0 +1,86 @@
+"""
+Comparaison à âge égal : pour chaque (discipline, personne), le record de pt_cse
+et le dernier résultat connus à chaque âge d'une grille commune (pas AGE_STEP ans).
+
+Les séries triées par âge sont alignées sur la grille par une jointure as-of
+vectorisée (pd.merge_asof, par discipline et personne). La grille est calculée une
+fois par chargement des données, sur tout l'historique, puis seulement relue.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.config import AGE_STEP
+from core.data import load_data
+
+AGE_KEYS = ["discipline", "person"]
+
+
+class AgeGrid:
+    def __init__(self, df: pd.DataFrame, step: float = AGE_STEP):
+        self.step = step
+        scored = df.loc[df["pt_cse"].notna() & df["age_years"].notna(), AGE_KEYS + ["age_years", "pt_cse"]]
+        scored = scored.sort_values("age_years", kind="stable")
+        scored["record"] = scored.groupby(AGE_KEYS, observed=True)["pt_cse"].cummin()
+
+        if scored.empty:
+            self.ages = np.empty(0)
+            self.table = pd.DataFrame(columns=AGE_KEYS + ["age", "record", "last"])
+            return
+
+        lo = np.floor(scored["age_years"].min() / step) * step
+        hi = np.ceil(scored["age_years"].max() / step) * step
+        self.ages = np.round(np.arange(lo, hi + step / 2, step), 6)
+
+        # grille (discipline, personne) x âges, puis dernier résultat à âge <= âge de la grille
+        keys = scored[AGE_KEYS].drop_duplicates()
+        grid = keys.merge(pd.DataFrame({"age": self.ages}), how="cross").sort_values("age", kind="stable")
+        aligned = pd.merge_asof(
+            grid,
+            scored.rename(columns={"pt_cse": "last"}),
+            left_on="age",
+            right_on="age_years",
+            by=AGE_KEYS,
+            direction="backward",
+        )
+        # rien avant la première course ni après la dernière (plus un pas) de chaque série
+        span = scored.groupby(AGE_KEYS, observed=True)["age_years"].agg(["min", "max"])
+        bounds = span.reindex(pd.MultiIndex.from_frame(aligned[AGE_KEYS]))
+        inside = (aligned["age"].to_numpy() <= bounds["max"].to_numpy() + step) & aligned["age_years"].notna().to_numpy()
+        self.table = aligned.loc[inside, AGE_KEYS + ["age", "record", "last"]].reset_index(drop=True)
+
+    def snap(self, age: float) -> float:
+        """Âge de la grille le plus proche."""
+        return round(round(age / self.step) * self.step, 6)
+
+    def select(self, disciplines, people) -> pd.DataFrame:
+        """Lignes de la grille des disciplines et personnes choisies."""
+        t = self.table
+        return t[t["discipline"].isin(list(disciplines)) & t["person"].isin(list(people))]
+
+    def at(self, age: float, disciplines, people) -> pd.DataFrame:
+        """
+        Record et dernier résultat de chacun à `age` (arrondi à la grille), plus l'écart
+        de record au meilleur de la discipline au même âge. Index (discipline, personne).
+        """
+        t = self.select(disciplines, people)
+        t = t[t["age"] == self.snap(age)].set_index(AGE_KEYS)[["record", "last"]]
+        t["gap"] = t["record"] - t.groupby(level="discipline", observed=True)["record"].transform("min")
+        return t
+
+    def common_age(self, disciplines, people) -> float | None:
+        """
+        Âge par défaut : le plus grand âge couvert par le plus de séries choisies, donc
+        un âge où toutes ont une ligne si leurs plages se recouvrent (None si aucune).
+        """
+        t = self.select(disciplines, people)
+        if t.empty:
+            return None
+        # une ligne par série et par âge : le compte par âge est le nombre de séries présentes
+        covered = t.groupby("age").size()
+        return float(covered.index[covered == covered.max()].max())
+
+
+@st.cache_resource
+def load_age_grid() -> AgeGrid:
+    return AgeGrid(load_data())
@@ -0,0 +1,303 @@
+import numpy as np
+import pandas as pd
+
+from core import query
+from core.metrics import discipline_sort_key, is_fleche, medal_label_discipline, ordered_medal_labels_for_axis
+
+
+# Libellés affichés à la place des points quand la course n'en donne pas
+STATUS_LABELS = {"DNF": "Abandon", "DNS": "Départ non pris", "DSQ": "Disqualifié"}
+
+
+def _season_display(f: pd.DataFrame) -> pd.Series:
+    season = f["season_num"]
+    if season.notna().all():
+        return season.astype("int64")
+    return season.astype("Int64").astype(object).where(season.notna(), f["season"].astype(object))
+
+
+def _station_display(f: pd.DataFrame) -> pd.Series:
+    station = f["station"].astype(object)
+    return station.mask(station.eq(""), "Inconnue")
+
+
+def _classement(f: pd.DataFrame) -> pd.Series:
+    rank = f["rank"].astype("Int64").astype("string")
+    participants = f["participants_count"].astype("Int64").astype("string")
+    return (rank + "/" + participants).fillna("—").astype(object)
+
+
+def recent_table(f: pd.DataFrame, cutoff: pd.Timestamp) -> pd.DataFrame:
+    """
+    Tableau des performances depuis `cutoff` pour toutes les personnes à la fois,
+    du plus récent au plus ancien. Sans points, Point course et Classement
+    affichent le statut (Abandon, Départ non pris, Disqualifié) ou "—".
+    """
+    f = f[f["event_dt"].notna() & (f["event_dt"] >= cutoff)]
+    f = f.sort_values(["event_dt", "season_num", "event_num"], ascending=[False, False, False])
+
+    pt = f["pt_cse"]
+    has_pt = pt.notna().to_numpy()
+    status = f["status"].astype(str).str.upper()
+    no_pt = np.select([(status == k).to_numpy() for k in STATUS_LABELS], list(STATUS_LABELS.values()), "—")
+    pt_txt = np.char.mod("%.2f", pt.to_numpy(dtype="float64", na_value=np.nan))
+
+    return pd.DataFrame(
+        {
+            "person": f["person"],
+            "discipline": f["discipline"],
+            "Saison": _season_display(f),
+            "Station": _station_display(f),
+            "Point course": np.where(has_pt, pt_txt, no_pt),
+            "Médaille": f["medal_simple"],
+            "Classement": np.where(has_pt, _classement(f), no_pt),
+        },
+        index=f.index,
+    )
+
+
+def top5_table(f: pd.DataFrame) -> pd.DataFrame:
+    """
+    Les 5 meilleurs pt_cse par (personne, discipline). À points égaux, le plus
+    récent passe devant.
+    """
+    f = query.top_k(
+        f,
+        ["person", "discipline"],
+        [("pt_cse", True), ("event_dt", False), ("season_num", True), ("event_num", True)],
+        5,
+        notna=["pt_cse"],
+    )
+
+    return pd.DataFrame(
+        {
+            "person": f["person"],
+            "discipline": f["discipline"],
+            "Saison": _season_display(f),
+            "Station": _station_display(f),
+            "Points course": f["pt_cse"].astype("float64"),
+            "Médaille": f["medal_simple"],
+            "Classement": _classement(f),
+        },
+        index=f.index,
+    )
+
+
+def status_counts(f: pd.DataFrame) -> pd.DataFrame:
+    """
+    Participations et statuts par (discipline, personne) : colonnes n, finished,
+    dnf, dsq, dns. Sans colonne status, tout est compté comme fini.
+    """
+    if "status" not in f.columns:
+        n = f.groupby(["discipline", "person"], observed=True, sort=False).size()
+        return pd.DataFrame({"n": n, "finished": n, "dnf": 0, "dsq": 0, "dns": 0})
+
+    counts = query.group_agg(f, ["discipline", "person", "status"], {"n": ("status", "size")})["n"]
+    by_status = counts.unstack("status", fill_value=0)
+    out = pd.DataFrame({"n": counts.groupby(level=["discipline", "person"], observed=True, sort=False).sum()})
+    for col, status in (("finished", "FINISHED"), ("dnf", "DNF"), ("dsq", "DSQ"), ("dns", "DNS")):
+        out[col] = by_status[status].reindex(out.index, fill_value=0) if status in by_status.columns else 0
+    return out.astype("int64")
+
+
+def medal_crosstab(f: pd.DataFrame) -> pd.DataFrame:
+    """Nombre de courses par (discipline, personne) x médaille simplifiée ("Rien" si vide)."""
+    medal_col = "medal_simple" if "medal_simple" in f.columns else "medal"
+    counts = query.group_agg(f, ["discipline", "person", medal_col], {"n": (medal_col, "size")})["n"]
+    out = counts.unstack(medal_col, fill_value=0)
+    out.columns = out.columns.astype(object).fillna("Rien")
+    return out
+
+
+def card_summary(f: pd.DataFrame) -> pd.DataFrame:
+    """
+    KPI des cartes en une seule agrégation groupée, une ligne par (personne, discipline) :
+    participations, taux d'épreuves finies (hors DNS), meilleure médaille, record pt_cse.
+    Pour chaque personne, les disciplines sont dans l'ordre d'affichage (Flèche d'abord).
+    """
+    cols = ["person", "discipline", "n", "finished_rate", "best_medal", "best_pt"]
+    f = f[f["person"].notna() & f["discipline"].notna()]
+    if f.empty:
+        return pd.DataFrame(columns=cols)
+
+    if "status" in f.columns:
+        status = f["status"]
+        work = pd.DataFrame(
+            {
+                "has_status": status.notna(),
+                # On ignore les DNS
+                "run": status != "DNS",
+                "finished": status == "FINISHED",
+            },
+            index=f.index,
+        )
+    else:
+        work = pd.DataFrame({"has_status": False, "run": True, "finished": True}, index=f.index)
+    work["person"] = f["person"]
+    work["discipline"] = f["discipline"]
+    work["pt_cse"] = f["pt_cse"]
+
+    g = work.groupby(["person", "discipline"], observed=True, sort=False)
+    out = g.agg(
+        n=("run", "size"),
+        has_status=("has_status", "any"),
+        n_run=("run", "sum"),
+        n_finished=("finished", "sum"),
+        best_pt=("pt_cse", "min"),
+    )
+
+    rate = 100.0 * out["n_finished"] / out["n_run"].where(out["n_run"] > 0)
+    # si pas de statut renseigné, on considère tout "fini"
+    out["finished_rate"] = rate.where(out["has_status"], 100.0)
+
+    best_idx = f.groupby(["person", "discipline"], observed=True, sort=False)["medal_score_new"].idxmax()
+    out["best_medal"] = f.loc[best_idx.reindex(out.index).to_numpy(), "medal_simple"].to_numpy()
+
+    out = out.reset_index()
+    order = {d: i for i, d in enumerate(sorted(out["discipline"].unique(), key=discipline_sort_key))}
+    out = out.sort_values("discipline", key=lambda s: s.astype(object).map(order), kind="stable")
+    return out[cols].reset_index(drop=True)
+
+
+def discipline_stats(f: pd.DataFrame, cutoff: pd.Timestamp) -> pd.DataFrame:
+    """
+    Statistiques par (personne, discipline) en une passe groupée vectorisée, pour
+    pt_cse et le centile (rank_relative * 100) : moyenne, moyenne top 5, moyenne
+    depuis `cutoff` et record (plus petite valeur).
+    Le top 5 suit avg_top5_open (les 5 plus petits pt_cse, premières occurrences
+    en cas d'égalité) ; le centile top 5 est la moyenne sur ces mêmes courses.
+    """
+    keys = ["person", "discipline"]
+    work = pd.DataFrame(
+        {
+            "person": f["person"],
+            "discipline": f["discipline"],
+            "pt": pd.to_numeric(f["pt_cse"], errors="coerce"),
+            "centile": pd.to_numeric(f["rank_relative"], errors="coerce") * 100,
+            "recent": f["event_dt"].notna() & (f["event_dt"] >= cutoff),
+            "pos": range(len(f)),
+        },
+        index=f.index,
+    )
+    work = work[work["person"].notna() & work["discipline"].notna()]
+
+    g = work.groupby(keys, observed=True, sort=False)
+    out = g.agg(
+        pt_mean=("pt", "mean"),
+        pt_record=("pt", "min"),
+        c_mean=("centile", "mean"),
+        c_best=("centile", "min"),
+    )
+
+    recent = work[work["recent"]].groupby(keys, observed=True, sort=False)
+    out["pt_3y"] = recent["pt"].mean()
+    out["c_3y"] = recent["centile"].mean()
+
+    # Top 5 : tri stable (groupe, pt, position) puis les 5 premiers rangs de chaque groupe
+    ranked = work[work["pt"].notna()].sort_values(keys + ["pt", "pos"], kind="stable")
+    top5 = ranked[ranked.groupby(keys, observed=True, sort=False).cumcount() < 5]
+    top5 = top5.groupby(keys, observed=True, sort=False)
+    out["pt_top5"] = top5["pt"].mean()
+    out["c_top5"] = top5["centile"].mean()
+
+    cols = ["pt_mean", "pt_top5", "pt_3y", "pt_record", "c_mean", "c_top5", "c_3y", "c_best"]
+    return out[cols]
+
+
+def _row_medal_labels(f: pd.DataFrame) -> pd.Series:
+    # medal_label déjà calculé, sinon libellé recalculé depuis (discipline, medal)
+    labels = f["medal_label"].astype(object)
+    missing = labels.isna()
+    if missing.any():
+        labels[missing] = [
+            medal_label_discipline(d, m)
+            for d, m in zip(f.loc[missing, "discipline"].astype(object), f.loc[missing, "medal"].astype(object))
+        ]
+    return labels
+
+
+def medal_recap(f: pd.DataFrame, best_season: bool) -> pd.DataFrame:
+    """
+    Récap des médailles par (saison, personne), une ligne par case où la personne
+    a couru. Si best_season : colonne "label", la meilleure médaille de la saison
+    (toutes disciplines) ou "Rien". Sinon : colonnes "fleche" et "chamois", les
+    libellés de chaque discipline dans l'ordre de l'axe des médailles.
+    """
+    work = pd.DataFrame(
+        {
+            "season": f["season_num"],
+            "person": f["person"],
+            "fleche": f["discipline"].map(is_fleche).astype(bool),
+            "label": _row_medal_labels(f),
+            "score": f["medal_score_new"],
+            "pos": range(len(f)),
+        },
+        index=f.index,
+    )
+    work = work[work["season"].notna() & work["person"].notna()]
+    work["season"] = work["season"].astype(int)
+    keys = ["season", "person"]
+
+    if best_season:
+        # première ligne au meilleur score (idxmax), ou première ligne sans score
+        work = work.sort_values(keys + ["score", "pos"], ascending=[True, True, False, True], na_position="last")
+        best = work.groupby(keys, observed=True, sort=False).head(1).set_index(keys)
+        label = best["label"].where(best["label"].notna(), "Rien").astype(str)
+        return label.where(label.str.strip() != "", "Rien").to_frame("label")
+
+    cells = work[keys].drop_duplicates().set_index(keys)
+    shown = work[work["label"].notna()].copy()
+    shown["label"] = shown["label"].astype(str)
+    shown = shown[shown["label"].str.strip() != ""]
+
+    # tri par ordre de l'axe des médailles (puis alpha pour stabilité)
+    fleche_rank = {m: i for i, m in enumerate(ordered_medal_labels_for_axis("Flèche"))}
+    chamois_rank = {m: i for i, m in enumerate(ordered_medal_labels_for_axis("Chamois"))}
+    shown["rank"] = np.where(
+        shown["fleche"],
+        shown["label"].map(fleche_rank).fillna(999),
+        shown["label"].map(chamois_rank).fillna(999),
+    )
+    shown = shown.sort_values(keys + ["rank", "label"], kind="stable")
+
+    lists = shown.groupby(keys + ["fleche"], sort=False)["label"].agg(list).unstack("fleche")
+    for col, flag in (("fleche", True), ("chamois", False)):
+        values = lists[flag].reindex(cells.index) if flag in lists.columns else [None] * len(cells)
+        cells[col] = [x if isinstance(x, list) else [] for x in values]
+    return cells
+
+
+def head_to_head(f: pd.DataFrame) -> pd.DataFrame:
+    """
+    Face-à-face sur les courses communes, par (discipline, personne, adversaire),
+    en une auto-jointure sur course_id puis une agrégation groupée :
+    courses, victoires et défaites (pt_cse plus petit gagne, un classé bat un non
+    classé) et écart moyen de pt_cse (personne - adversaire, courses où les deux
+    ont des points). Chaque paire apparaît dans les deux sens.
+    """
+    rows = f.loc[f["person"].notna(), ["course_id", "discipline", "person", "pt_cse"]]
+    # une ligne par (course, personne) : la meilleure si doublon
+    rows = rows.sort_values("pt_cse", na_position="last").drop_duplicates(["course_id", "person"])
+
+    pairs = rows.merge(rows[["course_id", "person", "pt_cse"]], on="course_id", suffixes=("", "_adv"))
+    pairs = pairs[pairs["person"].astype(object) != pairs["person_adv"].astype(object)]
+
+    pt = pairs["pt_cse"].to_numpy(dtype="float64", na_value=np.inf)
+    pt_adv = pairs["pt_cse_adv"].to_numpy(dtype="float64", na_value=np.inf)
+    work = pd.DataFrame(
+        {
+            "discipline": pairs["discipline"],
+            "person": pairs["person"],
+            "adversaire": pairs["person_adv"],
+            "win": pt < pt_adv,
+            "loss": pt > pt_adv,
+            "gap": pairs["pt_cse"] - pairs["pt_cse_adv"],
+        }
+    )
+    out = work.groupby(["discipline", "person", "adversaire"], observed=True).agg(
+        courses=("win", "size"),
+        wins=("win", "sum"),
+        losses=("loss", "sum"),
+        gap=("gap", "mean"),
+    )
+    return out.astype({"courses": "int32", "wins": "int32", "losses": "int32"})
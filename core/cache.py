@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from core.config import CACHE_DIR
+
+# À incrémenter quand le contenu de la table enrichie change (nouvelles colonnes, dtypes...)
+CACHE_VERSION = 3
+
+
+def fingerprint(path: str, *parts) -> str:
+    """
+    Clé de cache : taille + mtime du fichier source (ou de chaque fichier parquet d'un
+    dossier), plus le contenu JSON des `parts` (ex. PEOPLE, BIRTHDATES).
+    Toute modification de l'un d'eux change la clé.
+    """
+    files = sorted(Path(path).rglob("*.parquet")) if os.path.isdir(path) else [Path(path)]
+    h = hashlib.sha256()
+    h.update(f"{CACHE_VERSION}|{os.path.abspath(path)}".encode())
+    for file in files:
+        st = os.stat(file)
+        h.update(f"|{file}|{st.st_size}|{st.st_mtime_ns}".encode())
+    for part in parts:
+        h.update(json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode())
+    return h.hexdigest()[:16]
+
+
+def fingerprint_text(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:12]
+
+
+def _cache_path(name: str, key: str) -> Path:
+    return Path(CACHE_DIR) / f"{name}-{key}.feather"
+
+
+def frame_path(name: str, key: str) -> Path | None:
+    """Chemin du fichier en cache (Arrow IPC, lisible par pyarrow.dataset), ou None."""
+    path = _cache_path(name, key)
+    return path if path.exists() else None
+
+
+def read_frame(name: str, key: str) -> pd.DataFrame | None:
+    """Relit un DataFrame en cache (Arrow IPC non compressé, mappé en mémoire), ou None."""
+    path = _cache_path(name, key)
+    if not path.exists():
+        return None
+    try:
+        return feather.read_table(path, memory_map=True).to_pandas()
+    except (OSError, ValueError):
+        return None
+
+
+def write_frame(name: str, key: str, df: pd.DataFrame) -> None:
+    """
+    Écrit le DataFrame sous `CACHE_DIR` puis supprime les anciennes versions de `name`.
+    Écriture atomique (fichier temporaire + rename) ; un cache non inscriptible est ignoré.
+    """
+    path = _cache_path(name, key)
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+        for old in path.parent.glob(f"{name}-*.feather"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    except OSError:
+        tmp.unlink(missing_ok=True)
@@ -2,6 +2,27 @@ import streamlit as st
 
 PAGE_TITLE = "ComparaMif du ski"
 DATA_FILE = "results.parquet"
+DATASET_DIR = "results_dataset"  # remplace DATA_FILE s'il existe, créé à partir de lui (voir core.ingest)
+CACHE_DIR = ".cache"
+QUERY_BACKEND = "pandas"  # ou "arrow" (voir core.query), surchargé par MIF_QUERY_BACKEND
+FIGURE_CACHE_SIZE = 64  # figures Plotly gardées en mémoire (voir core.memo)
+FILTER_CACHE_TABLES = 2  # frames filtrés mémorisés : au plus 2 fois la table en lignes (voir core.filters)
+
+# Courbes "Points course" : au-delà de WEBGL_POINTS points, rendu WebGL et
+# chaque série (personne, discipline) réduite à ~DOWNSAMPLE_POINTS points (records gardés)
+WEBGL_POINTS = 1500
+DOWNSAMPLE_POINTS = 400
+
+# Champ complet des courses (voir core.field) : force du champ = moyenne des FIELD_TOP meilleurs pt_cse
+FIELD_TOP = 5
+
+# Pas de la grille d'âges commune (années) pour la comparaison à âge égal (voir core.age_grid)
+AGE_STEP = 0.25
+
+# Effectif : ROSTER_FILE (CSV person,birthdate[,name_raw]) s'il existe, sinon PEOPLE, BIRTHDATES et SHEET_NAMES (voir core.roster)
+ROSTER_FILE = "roster.csv"
+DEFAULT_PEOPLE = 4  # personnes cochées par défaut dans la barre latérale
+PEOPLE_PER_PAGE = 12  # cartes et tableaux par personne : pagination au-delà
 
 BIRTHDATES = {
     "Lucas": "1998-12-03",
@@ -12,6 +33,31 @@ BIRTHDATES = {
 
 PEOPLE = ["Lucas", "Léa", "Paul", "Papa"]
 
+# Nom tel qu'écrit sur les feuilles de résultats -> personne (ingestion, voir core.ingest)
+SHEET_NAMES = {
+    "GOBBI LUCAS": "Lucas",
+    "GOBBI LEA": "Léa",
+    "GOBBI PAUL": "Paul",
+    "GOBBI LAURENT": "Papa",
+}
+
+# Colonnes brutes de DATA_FILE réellement utilisées par load_data et les pages
+RESULT_COLUMNS = [
+    "season",
+    "station",
+    "discipline",
+    "event",
+    "event_date",
+    "pdf_file",
+    "rank",
+    "participants_count",
+    "rank_relative",
+    "person",
+    "status",
+    "pt_cse",
+    "medal",
+]
+
 MERGED_ORDER = ["Rien", "Cabri/Fléchette", "Bronze", "Argent", "Vermeil", "Or"]
 
 
@@ -1,7 +1,12 @@
+import numpy as np
 import pandas as pd
+import pyarrow.dataset as ds
 import streamlit as st
 
-from core.config import DATA_FILE, PEOPLE, BIRTHDATES
+from core import cache
+from core.config import DATA_FILE, DATASET_DIR, RESULT_COLUMNS
+from core.ingest import COURSE_KEY, list_partitions
+from core.roster import load_roster
 from core.metrics import (
     discipline_order,
     parse_event_number,
@@ -11,28 +16,156 @@ from core.metrics import (
     medal_label_merged,
 )
 
+# La table de load_data est partagée entre sessions : copy-on-write obligatoire
+# (comportement par défaut à partir de pandas 3). Avant pandas 3, l'option est
+# globale : importer core.data l'active pour tout le processus.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
 
-@st.cache_data
-def load_data() -> pd.DataFrame:
-    df = pd.read_parquet(DATA_FILE)
-    df = df[df["person"].isin(PEOPLE)].copy()
+# Colonnes texte à forte répétition, stockées en category
+CATEGORY_COLUMNS = [
+    "season",
+    "station",
+    "discipline",
+    "event",
+    "event_date",
+    "event_suf",
+    "pdf_file",
+    "person",
+    "status",
+    "medal",
+    "medal_simple",
+    "medal_label",
+    "medal_label_merged",
+    "course_label",
+]
 
-    df["season_num"] = pd.to_numeric(df["season"], errors="coerce")
-    df["discipline_ord"] = df["discipline"].apply(discipline_order)
+# Entiers à largeur fixe (schéma stable d'un chargement à l'autre)
+INT_DTYPES = {
+    "rank": "int32",
+    "participants_count": "int32",
+    "season_num": "int16",
+    "discipline_ord": "int8",
+    "event_num": "int16",
+    "medal_score_new": "int8",
+    "course_order": "int32",
+    "course_id": "int32",
+}
 
-    ev_num, ev_suf = zip(*df["event"].apply(parse_event_number))
-    df["event_num"] = ev_num
-    df["event_suf"] = ev_suf
+EVENT_DATE_FORMAT = "%d/%m/%Y"
 
-    df["pt_cse"] = pd.to_numeric(df["pt_cse"], errors="coerce")
+# Clés de tri des courses (course_order)
+COURSE_SORT = ["season_num", "event_num", "discipline_ord", "event_suf", "pdf_file"]
+
+
+def row_keys(*columns: pd.Series) -> np.ndarray:
+    """Clé entière par ligne, combinaison des codes de factorisation de chaque colonne."""
+    key = np.zeros(len(columns[0]), dtype="int64")
+    card = 1
+    for col in columns:
+        codes, uniques = pd.factorize(col, use_na_sentinel=True)
+        if card * (len(uniques) + 1) >= 2**62:
+            # recompacte la clé avant qu'elle ne déborde
+            key, uniq = pd.factorize(key)
+            card = len(uniq)
+        key = key * (len(uniques) + 1) + (codes + 1)
+        card *= len(uniques) + 1
+    return key
+
+
+def unique_codes(*columns: pd.Series) -> tuple[np.ndarray, list[tuple]]:
+    """
+    Factorise des lignes sur une ou plusieurs colonnes : renvoie le code de chaque
+    ligne et la liste des combinaisons distinctes (valeurs manquantes -> None).
+    """
+    codes, _ = pd.factorize(row_keys(*columns))
+    _, first = np.unique(codes, return_index=True)
+    values = zip(*(col.to_numpy(dtype=object)[first] for col in columns))
+    combos = [tuple(None if pd.isna(v) else v for v in combo) for combo in values]
+    return codes, combos
+
+
+def _map_unique(func, *columns: pd.Series, dtype=None):
+    """
+    Applique `func` une seule fois par valeur (ou combinaison) distincte,
+    puis diffuse le résultat sur toutes les lignes.
+    """
+    codes, combos = unique_codes(*columns)
+    return pd.array([func(*c) for c in combos], dtype=dtype).take(codes)
+
+
+def derive_columns(df: pd.DataFrame) -> None:
+    """
+    Colonnes dérivées (ordre discipline, numéro d'épreuve, médailles).
+    Chaque règle de core.metrics n'est évaluée qu'une fois par valeur distincte.
+    """
+    text = df["medal"].dtype
+
+    df["discipline_ord"] = _map_unique(discipline_order, df["discipline"], dtype="int64")
+
+    codes, events = unique_codes(df["event"])
+    parsed = [parse_event_number(e) for (e,) in events]
+    df["event_num"] = pd.array([n for n, _ in parsed], dtype="int64").take(codes)
+    df["event_suf"] = pd.array([suf for _, suf in parsed], dtype=df["event"].dtype).take(codes)
+
+    df["medal_score_new"] = _map_unique(medal_score_new, df["medal"], dtype="int64")
+    df["medal_simple"] = _map_unique(medal_simple, df["medal"], dtype=text)
+    df["medal_label"] = _map_unique(medal_label_discipline, df["discipline"], df["medal"], dtype=text)
+    df["medal_label_merged"] = _map_unique(medal_label_merged, df["medal"], dtype=text)
 
-    df["medal_score_new"] = df["medal"].apply(medal_score_new)
-    df["medal_simple"] = df["medal"].apply(medal_simple)
-    df["medal_label"] = df.apply(lambda r: medal_label_discipline(r["discipline"], r["medal"]), axis=1)
-    df["medal_label_merged"] = df["medal"].apply(medal_label_merged)
+
+def record_flags(df: pd.DataFrame) -> None:
+    """
+    Drapeaux calculés une fois au chargement, sur les lignes avec pt_cse (plus petit = meilleur) :
+    - season_best : meilleur résultat de la saison par (personne, discipline),
+      première occurrence en cas d'égalité ;
+    - running_record : record personnel courant par (personne, discipline) dans
+      l'ordre chronologique (égaler le record compte).
+    À appeler sur la table triée dans son ordre final.
+    """
+    pt = df["pt_cse"]
+    scored = df[pt.notna()]
+
+    season_best = np.zeros(len(df), dtype=bool)
+    seasons = scored[scored["season_num"].notna()]
+    best_idx = seasons.groupby(["person", "discipline", "season_num"], observed=True)["pt_cse"].idxmin()
+    season_best[df.index.get_indexer(best_idx.to_numpy())] = True
+    df["season_best"] = season_best
+
+    chrono = scored.sort_values(["event_dt", "discipline_ord", "person"])
+    best_so_far = chrono.groupby(["person", "discipline"], observed=True)["pt_cse"].cummin()
+    running_record = np.zeros(len(df), dtype=bool)
+    running_record[df.index.get_indexer(chrono.index[chrono["pt_cse"] == best_so_far])] = True
+    df["running_record"] = running_record
+
+
+def compact_results(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Schéma compact : textes répétés en category (un code entier par ligne + dictionnaire),
+    entiers réduits au plus petit type. Les flottants (points, centile, âge) restent en
+    float64 car ils sont affichés tels quels.
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col, dtype in INT_DTYPES.items():
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def enrich_results(df: pd.DataFrame, compact: bool = True) -> pd.DataFrame:
+    df = df.copy()
+
+    df["season_num"] = pd.to_numeric(df["season"], errors="coerce")
+    derive_columns(df)
+    df["pt_cse"] = pd.to_numeric(df["pt_cse"], errors="coerce")
 
     # --- Dates ---
-    df["event_dt"] = pd.to_datetime(df.get("event_date", None), errors="coerce")
+    # Format explicite : sinon pandas le devine sur la première valeur, et le résultat
+    # changerait selon le sous-ensemble chargé (partition, filtre). Les autres formats
+    # ("20/02/20 10h15") passent par la date de repli ci-dessous.
+    df["event_dt"] = pd.to_datetime(df.get("event_date", None), errors="coerce", format=EVENT_DATE_FORMAT)
 
     # Fallback date logic: season-01-01 + event_num days + discipline_ord seconds
     season_int = df["season_num"].fillna(1900).astype(int).astype(str)
@@ -46,33 +179,149 @@ def load_data() -> pd.DataFrame:
     df["event_dt"] = df["event_dt"].fillna(fallback_dt)
 
     # Birth dates + age in years at the event
-    df["birth_dt"] = pd.to_datetime(df["person"].map(BIRTHDATES), errors="coerce")
+    df["birth_dt"] = pd.to_datetime(df["person"].map(load_roster().birthdates), errors="coerce")
     df["age_years"] = (df["event_dt"] - df["birth_dt"]).dt.total_seconds() / (365.25 * 24 * 3600)
 
     # Stable ordering for internal course index
-    df = df.sort_values(
-        ["season_num", "event_num", "discipline_ord", "event_suf", "pdf_file"],
-        ascending=[True, True, True, True, True],
-    )
+    df = df.sort_values(COURSE_SORT, ascending=[True, True, True, True, True], ignore_index=True)
 
-    df["course_id"] = (
-        df["season"].astype(str)
-        + " | "
-        + df["discipline"].astype(str)
-        + "-"
-        + df["event"].astype(str)
-        + " | "
-        + df["pdf_file"].astype(str)
-    )
+    # course_order = rang de première apparition de chaque course dans l'ordre trié
+    # (factorisation en une passe, sans table intermédiaire ni merge)
+    df["course_order"] = pd.factorize(row_keys(*(df[c] for c in COURSE_KEY)))[0]
 
-    course_order = (
-        df[["course_id", "season_num", "event_num", "discipline_ord", "event_suf", "pdf_file"]]
-        .drop_duplicates()
-        .reset_index(drop=True)
-    )
-    course_order["course_order"] = range(len(course_order))
-    df = df.merge(course_order[["course_id", "course_order"]], on="course_id", how="left")
+    # Identifiant de course entier (remplace la chaîne "saison | discipline-épreuve | pdf")
+    df["course_id"] = df["course_order"]
 
     df["course_label"] = df["season"].astype(str) + " " + df["discipline"].astype(str) + "-" + df["event"].astype(str)
 
+    record_flags(df)
+
+    if compact:
+        df = compact_results(df)
     return df
+
+
+def read_results(
+    path: str = DATA_FILE,
+    people: list[str] | None = None,
+    columns: list[str] = RESULT_COLUMNS,
+) -> pd.DataFrame:
+    """
+    Lit uniquement les lignes de `people` (par défaut l'effectif, core.roster) et les colonnes `columns`.
+    Le filtre et la projection sont poussés dans le scanner pyarrow : les row groups
+    sans aucune de ces personnes (statistiques min/max) ne sont pas décodés, et les
+    lignes des autres concurrents ne sont jamais converties en pandas.
+    """
+    dataset = ds.dataset(path, format="parquet")
+    columns = [c for c in columns if c in dataset.schema.names]
+    people = load_roster().people if people is None else people
+    table = dataset.to_table(columns=columns, filter=ds.field("person").isin(list(people)))
+    return table.to_pandas()
+
+
+def merge_partitions(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Assemble des partitions déjà enrichies (chacune avec son course_order local).
+    L'ordre global est calculé sur la table des courses (une ligne par course),
+    puis reporté sur les lignes par simple indexation : aucune partition n'est
+    ré-enrichie ni re-triée ligne à ligne.
+    """
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    if len(parts) == 1:
+        return parts[0]
+
+    courses = []
+    for i, p in enumerate(parts):
+        first = p.drop_duplicates("course_order")
+        c = pd.DataFrame({k: first[k].astype(str) if k in ("event_suf", "pdf_file") else first[k] for k in COURSE_SORT})
+        c["part"] = i
+        c["local"] = first["course_order"].to_numpy()
+        courses.append(c)
+    courses = pd.concat(courses, ignore_index=True).sort_values(COURSE_SORT + ["part", "local"], kind="stable")
+
+    # lookup[offset de la partition + course_order local] -> course_order global
+    sizes = [int(p["course_order"].max()) + 1 for p in parts]
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    lookup = np.empty(sum(sizes), dtype="int64")
+    lookup[offsets[courses["part"].to_numpy()] + courses["local"].to_numpy()] = np.arange(len(courses))
+
+    row_offsets = np.repeat(offsets, [len(p) for p in parts])
+    df = pd.concat(parts, ignore_index=True)
+    df["course_order"] = lookup[row_offsets + df["course_order"].to_numpy()]
+    df = df.sort_values("course_order", kind="stable", ignore_index=True)
+    df["course_id"] = df["course_order"]
+
+    # Les records courants traversent les saisons : recalculés sur l'ensemble
+    record_flags(df)
+
+    # Les catégories diffèrent d'une partition à l'autre : concat les a élargies
+    return compact_results(df)
+
+
+def _roster_parts() -> tuple[list[str], dict]:
+    roster = load_roster()
+    return list(roster.people), roster.birthdates
+
+
+def _load_partitioned(root: str) -> pd.DataFrame:
+    # Chaque partition a son propre fichier en cache : seules les partitions
+    # nouvelles ou modifiées depuis le dernier chargement sont relues et enrichies.
+    parts = []
+    for pdir in list_partitions(root):
+        name = "part-" + cache.fingerprint_text(str(pdir.relative_to(root)))
+        key = cache.fingerprint(str(pdir), *_roster_parts())
+        part = cache.read_frame(name, key)
+        if part is None:
+            part = enrich_results(read_results(str(pdir)))
+            cache.write_frame(name, key, part)
+        parts.append(part)
+    return merge_partitions(parts)
+
+
+def _enriched_cache() -> tuple[str, str, bool]:
+    # Table enrichie persistée à côté des données : reconstruite seulement si
+    # les données (DATASET_DIR, sinon DATA_FILE) ou l'effectif (personnes, naissances) changent.
+    # Le dataset est créé à partir de DATA_FILE au premier ajout (core.ingest.seed_dataset).
+    partitioned = bool(list_partitions(DATASET_DIR))
+    source = DATASET_DIR if partitioned else DATA_FILE
+    name = "dataset" if partitioned else "results"
+    return name, cache.fingerprint(source, *_roster_parts()), partitioned
+
+
+def _build_enriched(partitioned: bool) -> pd.DataFrame:
+    return _load_partitioned(DATASET_DIR) if partitioned else enrich_results(read_results(DATA_FILE))
+
+
+@st.cache_resource
+def _shared_results() -> pd.DataFrame:
+    name, key, partitioned = _enriched_cache()
+    df = cache.read_frame(name, key)
+    if df is None:
+        df = _build_enriched(partitioned)
+        cache.write_frame(name, key, df)
+    return df
+
+
+def enriched_file() -> str | None:
+    """
+    Fichier Arrow IPC de la table enrichie (construit au besoin), interrogeable
+    sans la charger. None si le cache n'est pas inscriptible.
+    """
+    name, key, partitioned = _enriched_cache()
+    path = cache.frame_path(name, key)
+    if path is None:
+        cache.write_frame(name, key, _build_enriched(partitioned))
+        path = cache.frame_path(name, key)
+    return None if path is None else str(path)
+
+
+def load_data() -> pd.DataFrame:
+    """
+    Table enrichie, chargée une seule fois par processus et partagée entre les
+    sessions (pas de copie pickle à chaque rerun comme avec st.cache_data).
+    Chaque appel renvoie une vue copy-on-write : ajouter une colonne ou écrire
+    dans la vue la copie localement, la table partagée ne change jamais.
+    """
+    return _shared_results().copy(deep=False)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets : positions de `n_out` points qui gardent la
+    forme de la courbe (x trié croissant). Premier et dernier points toujours gardés.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    # n - 2 points intérieurs répartis en n_out - 2 seaux
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        # point moyen du seau suivant (ou dernier point)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        if nlo >= nhi:
+            cx, cy = x[-1], y[-1]
+        else:
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample_series(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: str,
+    by: list[str],
+    n_out: int,
+    keep: pd.Series | None = None,
+) -> pd.DataFrame:
+    """
+    Réduit chaque série (groupe `by`) à environ `n_out` points par LTTB sur
+    (x_col, y_col). Les lignes où `keep` est vrai (records...) sont toujours gardées.
+    L'ordre des lignes de `df` est conservé.
+    """
+    df = df[df[x_col].notna() & df[y_col].notna()]
+    x_all = df[x_col]
+    if pd.api.types.is_datetime64_any_dtype(x_all):
+        x_all = x_all.astype("int64")
+    x_all = x_all.to_numpy(dtype="float64")
+    y_all = df[y_col].to_numpy(dtype="float64")
+
+    mask = np.zeros(len(df), dtype=bool) if keep is None else keep.reindex(df.index, fill_value=False).to_numpy(dtype=bool, copy=True)
+    for pos in df.groupby(by, observed=True, sort=False).indices.values():
+        if len(pos) <= n_out:
+            mask[pos] = True
+            continue
+        pos = pos[np.argsort(x_all[pos], kind="stable")]
+        mask[pos[lttb_indices(x_all[pos], y_all[pos], n_out)]] = True
+    return df[mask]
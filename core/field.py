@@ -0,0 +1,107 @@
+"""
+Champ complet des courses : load_data ne garde que l'effectif, ce module relit
+tous les concurrents classés (pt_cse connu) des feuilles de résultats.
+
+Par course, les pt_cse sont triés une fois (tableaux concaténés + offsets) :
+rang virtuel, centile et force du champ se lisent ensuite par recherche
+dichotomique (np.searchsorted), en O(log n) par requête.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import streamlit as st
+
+from core.config import DATA_FILE, DATASET_DIR, FIELD_TOP
+from core.data import unique_codes
+from core.ingest import COURSE_KEY, list_partitions
+
+
+def _course_keys(combos: list[tuple]) -> list[tuple]:
+    # même clé pour la feuille brute (texte) et la table enrichie (category)
+    return [tuple("" if v is None else str(v) for v in combo) for combo in combos]
+
+
+class FieldIndex:
+    def __init__(self, df: pd.DataFrame):
+        df = df[df["pt_cse"].notna()]
+        codes, combos = unique_codes(*(df[c] for c in COURSE_KEY))
+        pt = df["pt_cse"].to_numpy(dtype="float64")
+        order = np.lexsort((pt, codes))
+
+        # values[offsets[c]:offsets[c + 1]] : pt_cse triés de la course c
+        self.values = pt[order]
+        self.sizes = np.bincount(codes, minlength=len(combos))
+        self.offsets = np.r_[0, np.cumsum(self.sizes)]
+        self._csum = np.r_[0.0, np.cumsum(self.values)]
+        self._slots = {k: i for i, k in enumerate(_course_keys(combos))}
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def slots(self, df: pd.DataFrame) -> np.ndarray:
+        """Position dans l'index de la course de chaque ligne de `df` (-1 si absente)."""
+        codes, combos = unique_codes(*(df[c] for c in COURSE_KEY))
+        lookup = np.array([self._slots.get(k, -1) for k in _course_keys(combos)], dtype="int64")
+        return lookup[codes]
+
+    def ranks(self, slots: np.ndarray, pts) -> np.ndarray:
+        """
+        Rang virtuel de chaque pt_cse dans le champ de sa course : 1 + nombre de
+        classés strictement meilleurs (les ex æquo partagent le rang). NaN si la
+        course ou le pt_cse manque.
+        """
+        slots = np.asarray(slots, dtype="int64")
+        pts = np.asarray(pts, dtype="float64")
+        out = np.full(len(pts), np.nan)
+
+        idx = np.flatnonzero((slots >= 0) & ~np.isnan(pts))
+        idx = idx[np.argsort(slots[idx], kind="stable")]
+        courses, starts = np.unique(slots[idx], return_index=True)
+        # une recherche dichotomique vectorisée par course présente
+        for c, sel in zip(courses, np.split(idx, starts[1:])):
+            field = self.values[self.offsets[c]:self.offsets[c + 1]]
+            out[sel] = np.searchsorted(field, pts[sel], side="left") + 1
+        return out
+
+    def percentiles(self, slots: np.ndarray, pts) -> np.ndarray:
+        """Centile dans le champ (rang virtuel / nombre de classés * 100, plus petit = meilleur)."""
+        slots = np.asarray(slots, dtype="int64")
+        sizes = np.where(slots >= 0, self.sizes[slots], 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.ranks(slots, pts) / sizes * 100
+
+    def strength(self, slots: np.ndarray, top: int = FIELD_TOP) -> np.ndarray:
+        """Force du champ : moyenne des `top` meilleurs pt_cse de la course (plus petit = plus relevé)."""
+        slots = np.asarray(slots, dtype="int64")
+        valid = slots >= 0
+        c = np.where(valid, slots, 0)
+        lo, n = self.offsets[c], np.minimum(self.sizes[c], top)
+        return np.where(valid, (self._csum[lo + n] - self._csum[lo]) / np.maximum(n, 1), np.nan)
+
+    def place(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rang virtuel, centile et force du champ de chaque ligne de `df` (index conservé)."""
+        slots = self.slots(df)
+        pts = df["pt_cse"].to_numpy(dtype="float64", na_value=np.nan)
+        return pd.DataFrame(
+            {
+                "rang_champ": self.ranks(slots, pts),
+                "centile_champ": self.percentiles(slots, pts),
+                "force_champ": self.strength(slots),
+            },
+            index=df.index,
+        )
+
+
+def read_field(path: str | None = None) -> pd.DataFrame:
+    """Tous les concurrents classés (clé de course + pt_cse), sans filtre sur l'effectif."""
+    if path is None:
+        path = DATASET_DIR if list_partitions(DATASET_DIR) else DATA_FILE
+    dataset = ds.dataset(path, format="parquet")
+    table = dataset.to_table(columns=COURSE_KEY + ["pt_cse"], filter=ds.field("pt_cse").is_valid())
+    return table.to_pandas()
+
+
+@st.cache_resource
+def load_field() -> FieldIndex:
+    # chargé au premier usage seulement (pages qui demandent le champ complet)
+    return FieldIndex(read_field())
@@ -0,0 +1,79 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.config import FILTER_CACHE_TABLES
+from core.data import load_data
+from core.memo import FILTER_KEY_ATTR, LRUCache
+
+GROUP_KEYS = ["person", "discipline", "season_num"]
+
+_versions = itertools.count()
+
+
+def next_version() -> int:
+    """Numéro unique par table chargée (premier élément des clés de filtre, cf. core.query)."""
+    return next(_versions)
+
+
+# Posé dans f.attrs : vrai si la fenêtre d'années commence avant la première saison
+# des données (les records courants précalculés valent alors pour le frame filtré)
+FULL_HISTORY_ATTR = "full_history"
+
+
+class FilterIndex:
+    """
+    Index des filtres de la barre latérale : positions des lignes par
+    (personne, discipline, saison), calculées une seule fois au chargement.
+    Un filtre devient l'union de quelques tableaux de positions, et le résultat
+    est mémorisé par clé (années, disciplines, personnes). Chaque frame mémorisé
+    est une copie des lignes choisies : la mémoire est bornée à FILTER_CACHE_TABLES
+    fois la table en lignes cumulées, pas seulement en nombre d'états de filtres.
+    """
+
+    def __init__(self, df: pd.DataFrame, maxsize: int = 64):
+        self.df = df
+        # distingue les clés de deux chargements successifs des données
+        self.version = next_version()
+        # positions par personne puis (discipline, saison) : un filtre ne parcourt que
+        # les personnes sélectionnées, quelle que soit la taille de l'effectif
+        self._groups: dict = {}
+        for (person, discipline, season), pos in df.groupby(GROUP_KEYS, observed=True, sort=False).indices.items():
+            self._groups.setdefault(person, []).append((discipline, season, pos))
+        self.first_season = df["season_num"].min()
+        self._memo = LRUCache(maxsize, maxweight=max(1, FILTER_CACHE_TABLES * len(df)), weigh=len, name="filtres")
+
+    def key(self, year_range: tuple[int, int], disciplines, people) -> tuple:
+        return (self.version, int(year_range[0]), int(year_range[1]), frozenset(disciplines), frozenset(people))
+
+    def positions(self, year_range: tuple[int, int], disciplines, people) -> np.ndarray:
+        year_start, year_end = year_range
+        disciplines, people = set(disciplines), set(people)
+        chunks = [
+            pos
+            for person in people
+            for discipline, season, pos in self._groups.get(person, ())
+            if discipline in disciplines and year_start <= season <= year_end
+        ]
+        if not chunks:
+            return np.empty(0, dtype="int64")
+        # Positions triées : même ordre de lignes que les masques booléens
+        return np.sort(np.concatenate(chunks))
+
+    def select(self, year_range: tuple[int, int], disciplines, people) -> pd.DataFrame:
+        key = self.key(year_range, disciplines, people)
+        return self._memo.get_or_compute(key, lambda: self._build(key, year_range, disciplines, people))
+
+    def _build(self, key: tuple, year_range, disciplines, people) -> pd.DataFrame:
+        f = self.df.iloc[self.positions(year_range, disciplines, people)]
+        # La clé suit le frame filtré : les calculs des pages sont mémorisés dessus
+        f.attrs[FILTER_KEY_ATTR] = key
+        f.attrs[FULL_HISTORY_ATTR] = bool(pd.isna(self.first_season) or year_range[0] <= self.first_season)
+        return f
+
+
+@st.cache_resource
+def load_filter_index() -> FilterIndex:
+    return FilterIndex(load_data())
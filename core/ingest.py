@@ -0,0 +1,450 @@
+"""
+Ingestion incrémentale dans le dataset partitionné DATASET_DIR
+(DATASET_DIR/season=<saison>/discipline=<discipline>/part-*.parquet).
+
+    python -m core.ingest nouvelles_courses.parquet [...]
+
+Une course (COURSE_KEY) déjà présente est remplacée : on peut ré-ingérer une
+feuille corrigée sans créer de doublons. Seules les partitions touchées sont
+réécrites ; load_data ne ré-enrichit ensuite que celles-ci.
+
+Dès que DATASET_DIR contient des partitions, load_data (et core.field) ne lisent
+plus DATA_FILE. Le premier ajout recopie donc d'abord tout DATA_FILE dans le
+dataset (seed_dataset), construit à côté puis renommé : l'historique n'est
+jamais perdu, même si la migration est interrompue.
+
+Feuilles de résultats exportées (tableaux extraits des PDF, en CSV/TSV) :
+
+    python -m core.ingest --sheets feuilles/ [--out results.parquet] [--workers 4]
+
+Les feuilles sont lues en parallèle (pool de processus) et normalisées au schéma
+de DATA_FILE (RAW_SCHEMA). Le manifeste <out>.sources.json garde, par feuille, le
+hash de son contenu et les pdf_file qu'elle a fournis : une feuille inchangée est
+sautée, les lignes d'une feuille modifiée ou supprimée sont retirées de <out>.
+Les lignes sont écrites au fil de l'eau par row groups de ROW_GROUP_ROWS, sans
+tout garder en mémoire. Quand DATASET_DIR existe, ingérer dans un autre fichier
+(--out) puis l'ajouter au dataset : DATA_FILE n'est plus lu.
+"""
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from core.config import DATA_FILE, DATASET_DIR
+from core.roster import load_roster
+
+# Identité d'une course (dédoublonnage)
+COURSE_KEY = ["season", "discipline", "event", "pdf_file"]
+PARTITION_KEYS = ["season", "discipline"]
+
+# Dossier des lignes sans saison ou sans discipline (valeur de repli de Hive) :
+# les fichiers gardent la valeur manquante, seul le nom du dossier la remplace
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _partition_name(value) -> str:
+    return NULL_PARTITION if pd.isna(value) else quote(str(value), safe="")
+
+
+def partition_dir(root: str, season, discipline) -> Path:
+    return Path(root) / f"season={_partition_name(season)}" / f"discipline={_partition_name(discipline)}"
+
+
+def list_partitions(root: str = DATASET_DIR) -> list[Path]:
+    """Dossiers de partition non vides, triés (saison puis discipline)."""
+    if not os.path.isdir(root):
+        return []
+    return sorted({p.parent for p in Path(root).glob("season=*/discipline=*/*.parquet")})
+
+
+def _course_index(df: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_frame(df[COURSE_KEY].astype(str))
+
+
+def _hidden_tmp(path: Path) -> Path:
+    # nom caché : ignoré par la découverte de fichiers de pyarrow.dataset pendant l'écriture
+    return path.with_name(f".{path.name}.tmp{os.getpid()}")
+
+
+def _write_atomic(df: pd.DataFrame, path: Path) -> None:
+    tmp = _hidden_tmp(path)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+    os.replace(tmp, path)
+
+
+def seed_dataset(root: str = DATASET_DIR, source: str = DATA_FILE) -> bool:
+    """
+    Crée le dataset `root` à partir de `source` s'il n'a encore aucune partition.
+    Écrit dans un dossier temporaire renommé à la fin. Renvoie True si la copie a eu lieu.
+    """
+    if list_partitions(root) or not os.path.exists(source):
+        return False
+    tmp = Path(f"{root}.seed-tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    append_results(pd.read_parquet(source), root=str(tmp), seed=None)
+    if os.path.isdir(root):
+        shutil.rmtree(root)  # aucune partition : dossiers vides seulement
+    os.replace(tmp, root)
+    return True
+
+
+def append_results(new: pd.DataFrame, root: str = DATASET_DIR, seed: str | None = DATA_FILE) -> list[Path]:
+    """
+    Ajoute des feuilles de résultats brutes (schéma de DATA_FILE) au dataset.
+    Les courses de `new` déjà présentes sont retirées des fichiers existants avant
+    l'écriture d'un nouveau fichier par partition. Renvoie les partitions modifiées.
+    Si le dataset est vide, il est d'abord rempli avec `seed` (None : pas de copie).
+    """
+    missing = [c for c in COURSE_KEY if c not in new.columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {missing}")
+    if seed is not None:
+        seed_dataset(root, seed)
+
+    changed = []
+    # dropna=False : les lignes sans saison ou discipline vont dans NULL_PARTITION
+    for (season, discipline), part in new.groupby(PARTITION_KEYS, sort=True, observed=True, dropna=False):
+        pdir = partition_dir(root, season, discipline)
+        pdir.mkdir(parents=True, exist_ok=True)
+        keys = _course_index(part).unique()
+
+        for file in sorted(pdir.glob("*.parquet")):
+            old = pq.read_table(file).to_pandas()
+            replaced = _course_index(old).isin(keys)
+            if not replaced.any():
+                continue
+            if replaced.all():
+                file.unlink()
+            else:
+                _write_atomic(old[~replaced], file)
+
+        digest = hashlib.sha1("|".join(map(str, keys)).encode() + str(time.time_ns()).encode()).hexdigest()[:12]
+        _write_atomic(part, pdir / f"part-{digest}.parquet")
+        changed.append(pdir)
+    return changed
+
+
+# Schéma des feuilles brutes (celui de DATA_FILE, lu par core.data.read_results)
+RAW_SCHEMA = pa.schema(
+    [
+        ("season", pa.string()),
+        ("station", pa.string()),
+        ("discipline", pa.string()),
+        ("event", pa.string()),
+        ("event_date", pa.string()),
+        ("pdf_file", pa.string()),
+        ("rank", pa.int64()),
+        ("participants_count", pa.int64()),
+        ("rank_relative", pa.float64()),
+        ("bib", pa.float64()),
+        ("code", pa.string()),
+        ("name_raw", pa.string()),
+        ("person", pa.string()),
+        ("birth_year", pa.int64()),
+        ("sex", pa.string()),
+        ("category_raw", pa.string()),
+        ("category_std", pa.string()),
+        ("time_raw", pa.string()),
+        ("time_seconds", pa.float64()),
+        ("status", pa.string()),
+        ("pt_cse", pa.float64()),
+        ("medal", pa.string()),
+        ("medal_score", pa.float64()),
+        ("tags", pa.string()),
+    ]
+)
+
+SHEET_SUFFIXES = {".csv", ".tsv", ".txt"}
+ROW_GROUP_ROWS = 65_536
+
+# Nom de fichier des feuilles : <saison>_<Station-Avec-Tirets>_<Discipline>-<épreuve>_<Personnes-Séparées>
+SHEET_NAME = re.compile(r"^(?P<season>\d{4})_(?P<station>.+)_(?P<discipline>[^_]+)-(?P<event>[^_]+)_(?P<tags>[^_]+)$")
+
+# En-têtes des exports (normalisés par _header) -> colonnes de RAW_SCHEMA
+COLUMN_ALIASES = {
+    "rang": "rank",
+    "clt": "rank",
+    "classement": "rank",
+    "dossard": "bib",
+    "dos": "bib",
+    "nom": "name_raw",
+    "nom prenom": "name_raw",
+    "licence": "code",
+    "annee": "birth_year",
+    "naissance": "birth_year",
+    "sexe": "sex",
+    "categorie": "category_raw",
+    "cat": "category_raw",
+    "temps": "time_raw",
+    "pt cse": "pt_cse",
+    "pts": "pt_cse",
+    "points": "pt_cse",
+    "medaille": "medal",
+    "statut": "status",
+}
+
+# Temps remplacé par un statut sur les feuilles
+STATUS_BY_TIME = {"abd": "DNF", "abs": "DNS", "dsq": "DSQ"}
+
+# Barème de medal_score des feuilles (l'ancien barème, différent de medal_score_new)
+MEDAL_SCORES = {"rien": 0.0, "cabri": 1.0, "fléchette": 1.0, "flechette": 1.0, "bronze": 2.0, "argent": 3.0, "vermeil": 3.5, "or": 4.0}
+
+
+def _plain(text: str) -> str:
+    """Majuscules sans accents ni espaces multiples (comparaison des noms)."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+    return " ".join(text.upper().split())
+
+
+def _header(name: str) -> str:
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode().lower()
+    return " ".join(re.sub(r"[_.]", " ", text).split())
+
+
+_CANONICAL = {**{_header(c): c for c in RAW_SCHEMA.names}, **COLUMN_ALIASES}
+
+
+def _number(col: pd.Series) -> pd.Series:
+    return pd.to_numeric(col.str.replace(",", ".", regex=False).str.strip(), errors="coerce")
+
+
+def _seconds(time_raw: pd.Series) -> pd.Series:
+    """Temps "41.67" ou "1:00.09" -> secondes ; NaN pour Abd, Abs, Dsq."""
+    parts = time_raw.str.extract(r"^\s*(?:(?:(\d+):)?(\d+):)?(\d+(?:[.,]\d*)?)\s*$")
+    hours, mins, secs = (_number(parts[i]) for i in range(3))
+    return hours.fillna(0) * 3600 + mins.fillna(0) * 60 + secs
+
+
+def _category_std(raw: pd.Series) -> pd.Series:
+    # masters (MA1..MA4, VH, VD) regroupés
+    return raw.where(~raw.str.fullmatch(r"MA\d+|V[HD]", na=False), "MAS")
+
+
+def sheet_pdf_file(path: Path) -> str:
+    """Nom du PDF d'origine d'une feuille exportée (même nom, extension .pdf)."""
+    return f"{path.stem}.pdf"
+
+
+def parse_sheet(path: str, names: dict) -> pa.Table:
+    """
+    Une feuille exportée (CSV/TSV, séparateur détecté) au schéma RAW_SCHEMA.
+    Saison, station, discipline, épreuve et personnes viennent des colonnes si
+    présentes, sinon du nom du fichier (SHEET_NAME). `names` : nom sur la feuille
+    -> personne de l'effectif.
+    """
+    path = Path(path)
+    raw = pd.read_csv(path, sep=None, engine="python", dtype=str, skipinitialspace=True)
+    raw = raw.rename(columns=lambda c: _CANONICAL.get(_header(c), c))
+    raw = raw.loc[:, ~raw.columns.duplicated()]
+    n = len(raw)
+
+    def text(col: str) -> pd.Series:
+        return raw[col].str.strip() if col in raw.columns else pd.Series(pd.NA, index=raw.index, dtype="string")
+
+    df = pd.DataFrame(index=raw.index)
+    meta = SHEET_NAME.match(path.stem)
+    meta = meta.groupdict() if meta else {}
+    meta["station"] = meta.get("station", "").replace("-", " ") or None
+    for col in ("season", "station", "discipline", "event", "tags"):
+        df[col] = text(col) if meta.get(col) is None else text(col).fillna(meta[col])
+    df["event_date"] = text("event_date")
+    df["pdf_file"] = text("pdf_file").fillna(sheet_pdf_file(path))
+
+    rank = _number(text("rank"))
+    df["rank"] = rank.fillna(pd.Series(np.arange(1, n + 1), index=raw.index))
+    df["participants_count"] = n
+    df["rank_relative"] = df["rank"] / n if n else np.nan
+
+    df["bib"] = _number(text("bib"))
+    df["code"] = text("code")
+    df["name_raw"] = text("name_raw")
+    plain = {_plain(k): v for k, v in names.items()}
+    df["person"] = text("person").fillna(df["name_raw"].map(lambda x: plain.get(_plain(x)), na_action="ignore"))
+    df["birth_year"] = _number(text("birth_year")).astype("Int64")
+    df["sex"] = text("sex")
+    df["category_raw"] = text("category_raw")
+    df["category_std"] = text("category_std").fillna(_category_std(df["category_raw"]))
+
+    df["time_raw"] = text("time_raw")
+    df["time_seconds"] = _seconds(df["time_raw"])
+    from_time = df["time_raw"].str.lower().map(STATUS_BY_TIME)
+    finished = pd.Series(np.where(df["time_seconds"].notna(), "FINISHED", None), index=raw.index)
+    df["status"] = text("status").str.upper().fillna(from_time).fillna(finished)
+
+    df["pt_cse"] = _number(text("pt_cse"))
+    df["medal"] = text("medal")
+    df["medal_score"] = df["medal"].str.lower().map(MEDAL_SCORES)
+    return pa.Table.from_pandas(df[RAW_SCHEMA.names], schema=RAW_SCHEMA, preserve_index=False)
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_manifest(path: Path, src: Path) -> dict:
+    """
+    {feuille relative à src: {"hash", "pdf_files"}}. Les entrées de l'ancien format
+    {feuille: hash} sont relues (hash oublié) pour noter leurs vrais pdf_file.
+    """
+    manifest = json.loads(path.read_text())
+    return {
+        rel: entry if isinstance(entry, dict) else {"hash": None, "pdf_files": [sheet_pdf_file(src / rel)]}
+        for rel, entry in manifest.items()
+    }
+
+
+class _RowGroupWriter:
+    """Écrit des tables au fil de l'eau, regroupées en row groups de `rows` lignes."""
+
+    def __init__(self, path: Path, rows: int):
+        self.writer = pq.ParquetWriter(path, RAW_SCHEMA)
+        self.rows = rows
+        self.pending: list[pa.Table] = []
+        self.n_pending = 0
+        self.written = 0
+
+    def write(self, table: pa.Table) -> None:
+        self.pending.append(table)
+        self.n_pending += table.num_rows
+        if self.n_pending >= self.rows:
+            self._flush(full_only=True)
+
+    def _flush(self, full_only: bool) -> None:
+        table = pa.concat_tables(self.pending)
+        n = table.num_rows - table.num_rows % self.rows if full_only else table.num_rows
+        if n:
+            self.writer.write_table(table.slice(0, n), row_group_size=self.rows)
+            self.written += n
+        rest = table.slice(n)
+        self.pending, self.n_pending = ([rest], rest.num_rows) if rest.num_rows else ([], 0)
+
+    def close(self) -> None:
+        if self.pending:
+            self._flush(full_only=False)
+        self.writer.close()
+
+
+def ingest_sheets(
+    src: str,
+    out: str = DATA_FILE,
+    workers: int | None = None,
+    rows: int = ROW_GROUP_ROWS,
+) -> tuple[int, int]:
+    """
+    Ingère les feuilles de `src` (récursif) dans le parquet `out`. Les feuilles
+    inchangées depuis la dernière ingestion (hash du contenu) sont sautées. Les
+    lignes de `out` venant des feuilles modifiées ou supprimées (pdf_file notés
+    dans le manifeste) sont remplacées ou retirées, les autres recopiées par lots.
+    Renvoie (feuilles lues, lignes écrites).
+
+    Refuse (ValueError) d'écrire DATA_FILE quand DATASET_DIR existe (load_data ne
+    le lirait plus), deux feuilles de même nom ou deux feuilles d'un même pdf_file.
+    """
+    src, out = Path(src), Path(out)
+    if out.resolve() == Path(DATA_FILE).resolve() and list_partitions(DATASET_DIR):
+        raise ValueError(
+            f"{DATASET_DIR} existe : load_data ne lit plus {DATA_FILE}. Ingérer dans un autre "
+            f"fichier (--out feuilles.parquet) puis l'ajouter au dataset (python -m core.ingest feuilles.parquet)."
+        )
+    manifest_path = out.with_name(out.name + ".sources.json")
+    manifest = _read_manifest(manifest_path, src) if out.exists() and manifest_path.exists() else {}
+
+    sources = sorted(p for p in src.rglob("*") if p.is_file() and p.suffix.lower() in SHEET_SUFFIXES)
+    by_stem: dict[str, list[str]] = {}
+    for p in sources:
+        by_stem.setdefault(p.stem, []).append(str(p.relative_to(src)))
+    clashes = {stem: rels for stem, rels in by_stem.items() if len(rels) > 1}
+    if clashes:
+        raise ValueError(f"Feuilles de même nom (même pdf_file) : {clashes}")
+
+    hashes = {str(p.relative_to(src)): _file_hash(p) for p in sources}
+    changed = {rel for rel, h in hashes.items() if manifest.get(rel, {}).get("hash") != h}
+    removed = {rel for rel in manifest if rel not in hashes}
+    if not changed and not removed:
+        return 0, 0
+
+    # pdf_file des feuilles inchangées (à garder) et des feuilles modifiées ou supprimées (à retirer)
+    owners = {pdf: rel for rel, entry in manifest.items() if rel in hashes and rel not in changed for pdf in entry["pdf_files"]}
+    stale = {pdf for rel in changed | removed for pdf in manifest.get(rel, {}).get("pdf_files", [])}
+
+    tmp = _hidden_tmp(out)
+    writer = _RowGroupWriter(tmp, rows)
+    entries = {rel: manifest[rel] for rel in hashes if rel in manifest and rel not in changed}
+    fresh: set[str] = set()
+    try:
+        parse = functools.partial(parse_sheet, names=load_roster().names)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            todo = sorted(changed)
+            for rel, table in zip(todo, pool.map(parse, [str(src / rel) for rel in todo])):
+                pdf_files = sorted(table.column("pdf_file").drop_null().unique().to_pylist())
+                taken = {pdf: owners[pdf] for pdf in pdf_files if pdf in owners}
+                if taken:
+                    raise ValueError(f"{rel} : pdf_file déjà fourni par une autre feuille : {taken}")
+                owners.update(dict.fromkeys(pdf_files, rel))
+                fresh.update(pdf_files)
+                entries[rel] = {"hash": hashes[rel], "pdf_files": pdf_files}
+                writer.write(table)
+
+        if out.exists():
+            replaced = pa.array(sorted(stale | fresh), type=pa.string())
+            kept = ds.dataset(out, format="parquet").scanner(
+                columns=RAW_SCHEMA.names,
+                filter=~ds.field("pdf_file").isin(replaced) | ds.field("pdf_file").is_null(),
+                batch_size=rows,
+            )
+            for batch in kept.to_batches():
+                writer.write(pa.Table.from_batches([batch]).cast(RAW_SCHEMA))
+        writer.close()
+    except BaseException:
+        writer.writer.close()
+        tmp.unlink(missing_ok=True)
+        raise
+
+    os.replace(tmp, out)
+    manifest_path.write_text(json.dumps(dict(sorted(entries.items())), indent=1, ensure_ascii=False))
+    return len(changed), writer.written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", help="fichiers parquet au schéma de results.parquet")
+    parser.add_argument("--root", default=DATASET_DIR)
+    parser.add_argument("--sheets", help="dossier de feuilles exportées (CSV/TSV) à ingérer dans --out")
+    parser.add_argument("--out", default=DATA_FILE)
+    parser.add_argument("--workers", type=int, default=None, help="processus de lecture (défaut : nombre de CPU)")
+    args = parser.parse_args()
+    if not args.files and not args.sheets:
+        parser.error("indiquer des fichiers parquet ou --sheets")
+
+    if args.sheets:
+        try:
+            n_sheets, n_rows = ingest_sheets(args.sheets, out=args.out, workers=args.workers)
+        except ValueError as exc:
+            parser.error(str(exc))
+        print(f"{args.sheets} : {n_sheets} feuille(s) modifiée(s), {n_rows} ligne(s) écrite(s) dans {args.out}")
+
+    for file in args.files:
+        changed = append_results(pd.read_parquet(file), root=args.root)
+        print(f"{file} : {len(changed)} partition(s) mise(s) à jour")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from core.config import FIGURE_CACHE_SIZE
+
+# Clé posée par FilterIndex.select dans f.attrs : identifie l'état des filtres
+FILTER_KEY_ATTR = "filter_key"
+
+# Caches nommés : leurs compteurs sont affichés par core.profiling (panneau, logs)
+_caches: dict = {}
+
+
+class LRUCache:
+    """
+    Cache LRU borné et thread-safe (partagé entre les sessions Streamlit).
+    Borne en nombre d'entrées (`maxsize`) et, si `maxweight` est donné, en poids
+    total (`weigh(valeur)`, ex. nombre de lignes) ; la dernière entrée est toujours gardée.
+    Avec `name`, le cache est inscrit dans cache_stats (le dernier créé sous ce nom).
+    """
+
+    def __init__(self, maxsize: int = 128, maxweight: int | None = None, weigh=None, name: str | None = None):
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.weigh = weigh
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._weights: dict = {}
+        self._lock = threading.Lock()
+        if name is not None:
+            _caches[name] = self
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self.weight -= self._weights.pop(key, 0)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxweight is not None:
+                self._weights[key] = self.weigh(value)
+                self.weight += self._weights[key]
+            while len(self._data) > self.maxsize or (
+                self.maxweight is not None and self.weight > self.maxweight and len(self._data) > 1
+            ):
+                old, _ = self._data.popitem(last=False)
+                self.weight -= self._weights.pop(old, 0)
+
+    def get_or_compute(self, key, func):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = func()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def cache_stats() -> dict:
+    """{nom: {entries, hits, misses}} des caches nommés, compteurs cumulés depuis le démarrage."""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+_results = LRUCache(maxsize=256, name="resultats")
+
+
+def filter_key(f: pd.DataFrame):
+    return f.attrs.get(FILTER_KEY_ATTR)
+
+
+def memoized(name: str, f: pd.DataFrame, func, *extra):
+    """
+    Calcule `func()` une fois par (name, état des filtres de f, *extra).
+    Si `f` ne porte pas de clé de filtre, le calcul est fait sans cache.
+    """
+    key = filter_key(f)
+    if key is None:
+        return func()
+    return _results.get_or_compute((name, key, *extra), func)
+
+
+# Figures Plotly déjà construites. st.plotly_chart ne fait que les lire (to_dict),
+# on peut donc partager l'objet Figure : le stocker sérialisé obligerait Streamlit
+# à le revalider à chaque affichage.
+figures = LRUCache(maxsize=FIGURE_CACHE_SIZE, name="figures")
+
+
+def cached_figure(name, f: pd.DataFrame, build, *toggles):
+    """
+    Figure `build()` mémorisée par (name, état des filtres de f, *toggles).
+    Les bascules de page qui ne changent pas la figure ne la reconstruisent pas.
+    """
+    key = filter_key(f)
+    if key is None:
+        return build()
+    return figures.get_or_compute((name, key, *toggles), build)
+
+
+def clear_caches() -> None:
+    """Vide les résultats et figures mémorisés (mesures à froid, cf. benchmarks)."""
+    _results.clear()
+    figures.clear()
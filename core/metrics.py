@@ -22,6 +22,11 @@ def is_fleche(d: str) -> bool:
     return ("fl" in dl) and (not is_chamois(d))
 
 
+def discipline_sort_key(d: str) -> tuple[int, str]:
+    # Flèche d'abord, puis Chamois
+    return (0 if is_fleche(d) else 1, str(d))
+
+
 def discipline_label(d: str) -> str:
     return "Chamois" if is_chamois(d) else "Flèche"
 
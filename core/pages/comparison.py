@@ -2,8 +2,106 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 
-from core.config import PEOPLE, BIRTHDATES, apply_css
-from core.metrics import is_fleche, is_chamois, discipline_label, avg_top5_open
+from core.aggregations import (
+    card_summary,
+    discipline_stats,
+    head_to_head,
+    medal_crosstab,
+    recent_table,
+    status_counts,
+    top5_table,
+)
+from core import roster
+from core.config import apply_css
+from core.memo import cached_figure, memoized
+from core.metrics import is_chamois, discipline_label, discipline_sort_key, avg_top5_open
+from core.pages.pagination import paginate
+from core.profiling import fragment_span, span
+
+
+def _medal_bar(counts: pd.DataFrame, medal_axis: list[str], height: int, category_orders=None, **facets):
+    """Histogramme des médailles (colonnes Médaille, Nombre), éventuellement à facettes."""
+    low_label = medal_axis[0]
+    color_map = {
+        low_label: "#FFFFFF",
+        "Bronze": "#8C6239",
+        "Argent": "#B0B0B0",
+        "Vermeil": "#87CEFA",
+        "Or": "#FFD700",
+    }
+
+    fig = px.bar(
+        counts,
+        x="Médaille",
+        y="Nombre",
+        color="Médaille",
+        text="Nombre",
+        category_orders={"Médaille": medal_axis, **(category_orders or {})},
+        color_discrete_map=color_map,
+        **facets,
+    )
+    fig.update_layout(
+        showlegend=False,
+        height=height,
+        margin=dict(l=0, r=0, t=10, b=0),
+    )
+    fig.update_traces(
+        marker_line_width=1,
+        marker_line_color="rgba(255,255,255,0.35)",
+    )
+    return fig
+
+
+def _medal_facets(counts: pd.DataFrame, medal_axis: list[str]):
+    """Un histogramme à facettes (une par personne) à partir des lignes personne x médaille."""
+    people = counts.index.tolist()
+    long = counts.rename_axis(index="Personne", columns="Médaille").stack().reset_index(name="Nombre")
+    fig = _medal_bar(
+        long,
+        medal_axis,
+        height=240 * ((len(people) + 2) // 3),
+        facet_col="Personne",
+        facet_col_wrap=3,
+        category_orders={"Personne": people},
+    )
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=", 1)[-1]))
+    return fig
+
+
+def _lazy_tabs(disciplines: list[str], key: str) -> list:
+    """
+    Onglets par discipline dont seul l'onglet ouvert est calculé : changer
+    d'onglet relance le fragment de la section, pas toute la page.
+    """
+    tabs = st.tabs([discipline_label(d) for d in disciplines], key=key, on_change="rerun")
+    return [(tab, d) for tab, d in zip(tabs, disciplines) if tab.open is not False]
+
+
+def _split_by_discipline_person(table: pd.DataFrame) -> dict:
+    """{discipline: {personne: lignes à afficher}} en un seul groupby, ordre des lignes conservé."""
+    blocks: dict = {}
+    for (d, p), rows in table.groupby(["discipline", "person"], observed=True, sort=False):
+        blocks.setdefault(d, {})[p] = rows.drop(columns=["discipline", "person"]).reset_index(drop=True)
+    return blocks
+
+
+def _head_to_head_matrices(h2h: pd.DataFrame) -> dict:
+    """{discipline: matrice personne x (statistique, adversaire)} à partir du face-à-face long."""
+    return {d: rows.droplevel("discipline").unstack("adversaire") for d, rows in h2h.groupby(level="discipline", observed=True)}
+
+
+def _head_to_head_cells(matrix: pd.DataFrame, people: list[str]) -> pd.DataFrame:
+    """Cases affichées : "victoires–défaites / courses (écart moyen)", vides sans course commune."""
+    adversaries = roster.ordered(matrix["courses"].columns)
+    m = matrix.reindex(index=people)
+    wins = m["wins"].reindex(columns=adversaries).astype("Int64").astype("string")
+    losses = m["losses"].reindex(columns=adversaries).astype("Int64").astype("string")
+    courses = m["courses"].reindex(columns=adversaries).astype("Int64").astype("string")
+    gap = m["gap"].reindex(columns=adversaries).map(lambda x: f" ({x:+.2f})", na_action="ignore").astype("string")
+    cells = (wins + "–" + losses + " / " + courses + gap.fillna("")).fillna("")
+    cells.index.name = None
+    cells.columns.name = None
+    return cells
 
 
 def render_comparison_page(f: pd.DataFrame, discipline_sel: list[str]) -> None:
@@ -12,472 +110,297 @@ def render_comparison_page(f: pd.DataFrame, discipline_sel: list[str]) -> None:
     # =========================
     # Cartes
     # =========================
-    st.subheader("Cartes")
+    with span("comparaison.cartes"):
+        st.subheader("Cartes")
+
+        cols = st.columns(3)
+
+        # KPI de toutes les cartes en une agrégation groupée (personne, discipline)
+        summary = card_summary(f)
+        blocks_by_person = {
+            p: list(rows[["discipline", "n", "finished_rate", "best_medal", "best_pt"]].itertuples(index=False, name=None))
+            for p, rows in summary.groupby("person", observed=True, sort=False)
+        }
+        cards = [(p, blocks_by_person[p]) for p in paginate(roster.ordered(blocks_by_person), key="cards_page")]
+
+        # âge actuel
+        today = pd.Timestamp.today().normalize()
+
+        for idx, (p, blocks) in enumerate(cards):
+            col = cols[idx % 3]
+            age = roster.age_now(p, today)
+            age_txt = "—" if age is None else f"{age} ans"
+
+            parts = []
+            for d, n, finished_rate, best_medal, best_pt in blocks:
+                record_txt = f"{best_pt:.2f}" if pd.notna(best_pt) else "—"
+                finished_txt = "—" if pd.isna(finished_rate) else f"{finished_rate:.0f}%"
+
+                parts.append(
+                    f"""
+                    <div class="mif-section-title">{discipline_label(d)}</div>
+                    <div class="kpi"><span>Participations</span><b>{n}</b></div>
+                    <div class="kpi"><span>Épreuves finies</span><b>{finished_txt}</b></div>
+                    <div class="kpi"><span>Meilleure médaille</span><b>{best_medal}</b></div>
+                    <div class="kpi"><span>Record Points OPEN (sur une course)</span><b>{record_txt}</b></div>
+                    """.strip()
+                )
 
-    cols = st.columns(3)
+            parts_html = "\n<div class='mif-divider'></div>\n".join(parts)
 
-    # âge actuel
-    age_now = {}
-    today = pd.Timestamp.today().normalize()
-    for p in PEOPLE:
-        birth_dt = pd.to_datetime(BIRTHDATES.get(p), errors="coerce")
-        if pd.isna(birth_dt):
-            age_now[p] = None
-        else:
-            age_now[p] = int(((today - birth_dt).days) // 365)
-
-    cards = []
-    for p in PEOPLE:
-        sub_p = f[f["person"] == p]
-        if sub_p.empty:
-            continue
-
-        blocks = []
-        for d in sorted(sub_p["discipline"].dropna().unique(), key=lambda x: (0 if is_fleche(x) else 1, str(x))):
-            sub = sub_p[sub_p["discipline"] == d]
-            if sub.empty:
-                continue
-
-            n = len(sub)
-
-            # épreuves finies (taux)
-            if "status" in sub.columns and sub["status"].notna().any():
-                # On ignore les DNS
-                sub_run = sub[sub["status"] != "DNS"]
-
-                n_run = len(sub_run)
-
-                if n_run > 0:
-                    finished = int((sub_run["status"] == "FINISHED").sum())
-                    finished_rate = 100.0 * finished / n_run
-                else:
-                    finished_rate = None
-            else:
-                # si pas de colonne status, on considère tout "fini"
-                finished = n
-                finished_rate = 100.0 if n > 0 else None
-
-            best_medal = sub.loc[sub["medal_score_new"].idxmax(), "medal_simple"]
-            best_pt = sub["pt_cse"].min() if sub["pt_cse"].notna().any() else None
-
-            blocks.append((d, n, finished_rate, best_medal, best_pt))
-
-        cards.append((p, blocks))
-
-    for idx, (p, blocks) in enumerate(cards):
-        col = cols[idx % 3]
-        age_txt = "—" if age_now.get(p) is None else f"{age_now[p]} ans"
-
-        parts = []
-        for d, n, finished_rate, best_medal, best_pt in blocks:
-            record_txt = f"{best_pt:.2f}" if best_pt is not None else "—"
-            finished_txt = "—" if finished_rate is None else f"{finished_rate:.0f}%"
-
-            parts.append(
-                f"""
-                <div class="mif-section-title">{discipline_label(d)}</div>
-                <div class="kpi"><span>Participations</span><b>{n}</b></div>
-                <div class="kpi"><span>Épreuves finies</span><b>{finished_txt}</b></div>
-                <div class="kpi"><span>Meilleure médaille</span><b>{best_medal}</b></div>
-                <div class="kpi"><span>Record Points OPEN (sur une course)</span><b>{record_txt}</b></div>
-                """.strip()
-            )
-
-        parts_html = "\n<div class='mif-divider'></div>\n".join(parts)
-
-        html = f"""
-        <div class="mif-card">
-            <div class="mif-card-header">
-                <div class="name">{p}</div>
-                <div class="age">{age_txt}</div>
+            html = f"""
+            <div class="mif-card">
+                <div class="mif-card-header">
+                    <div class="name">{p}</div>
+                    <div class="age">{age_txt}</div>
+                </div>
+                {parts_html}
             </div>
-            {parts_html}
-        </div>
-        """.strip()
+            """.strip()
+
+            with col:
+                st.markdown(html, unsafe_allow_html=True)
+
+    _resultats_section(f)
+    _statistiques_section(f)
+    _recentes_section(f)
+    _top5_section(f, discipline_sel)
+    _face_a_face_section(f, discipline_sel)
 
-        with col:
-            st.markdown(html, unsafe_allow_html=True)
 
+@st.fragment
+def _resultats_section(f: pd.DataFrame) -> None:
     # =========================
     # Résultats
     # =========================
-    st.divider()
-    st.subheader("Résultats")
-
-    src = f.copy()
-    if src.empty:
-        st.info("Aucune donnée.")
-    else:
-        disciplines_res = sorted(
-            src["discipline"].dropna().unique().tolist(),
-            key=lambda x: (0 if is_fleche(x) else 1, str(x)),
-        )
-
-        tabs_res = st.tabs([discipline_label(d) for d in disciplines_res])
-
-        for tab, d in zip(tabs_res, disciplines_res):
-            with tab:
-                df_d = src[src["discipline"] == d].copy()
-                if df_d.empty:
-                    st.info("Aucun résultat pour cette discipline.")
-                    continue
-
-                people_present = [p for p in PEOPLE if not df_d[df_d["person"] == p].empty]
-                if not people_present:
-                    st.info("Aucune personne pour cette discipline.")
-                    continue
+    with fragment_span("comparaison.resultats"):
+        st.divider()
+        st.subheader("Résultats")
 
-                cols_people = st.columns(3)
-
-                for i, p in enumerate(people_present):
-                    with cols_people[i % 3]:
-                        sub = df_d[df_d["person"] == p].copy()
-                        if sub.empty:
-                            continue
-
-                        # --- Stats ---
-                        total = len(sub)
-                        if "status" in sub.columns:
-                            finished = int((sub["status"] == "FINISHED").sum())
-                            abandons = int((sub["status"] == "DNF").sum())
-                            disq = int((sub["status"] == "DSQ").sum())
-                            dns = int((sub["status"] == "DNS").sum())
-                        else:
-                            finished, abandons, disq, dns = total, 0, 0, 0
-
-                        # Bloc à hauteur fixe (SANS indentation -> pas de "code block")
-                        extra_lines = []
-                        if abandons > 0:
-                            extra_lines.append(f"<div>Abandons : <b>{abandons}</b></div>")
-                        if disq > 0:
-                            extra_lines.append(f"<div>Disqualifications : <b>{disq}</b></div>")
-                        if dns > 0:
-                            extra_lines.append(f"<div>Départs non pris : <b>{dns}</b></div>")
-
-                        stats_html = (
-                            "<div style='min-height:140px;'>"
-                            f"<div style='font-size:1.1rem;font-weight:700;margin-bottom:0.35rem;'>{p}</div>"
-                            f"<div>Participations : <b>{total}</b></div>"
-                            f"<div>Épreuves finies : <b>{finished}</b></div>"
-                            + "".join(extra_lines)
-                            + "</div>"
-                        )
+        if f.empty:
+            st.info("Aucune donnée.")
+        else:
+            # Un seul regroupement pour toutes les cases : statuts et (discipline, personne) x médaille
+            statuses = status_counts(f)
+            medals = medal_crosstab(f)
 
-                        st.markdown(stats_html, unsafe_allow_html=True)
+            disciplines_res = sorted(statuses.index.unique(level="discipline"), key=discipline_sort_key)
 
-                        # =========================
-                        # Histogramme médailles (Cabri/Fléchette -> Or)
-                        # =========================
-                        medal_col = "medal_simple" if "medal_simple" in sub.columns else "medal"
-                        sub[medal_col] = sub[medal_col].fillna("Rien")
+            # Option : un graphique à facettes par discipline au lieu d'un graphique par personne
+            facet_medals = st.toggle("Histogrammes regroupés par discipline", value=False)
 
-                        low_label = "Cabri" if is_chamois(d) else "Fléchette"
-                        medal_axis = [low_label, "Bronze", "Argent", "Vermeil", "Or"]
+            for tab, d in _lazy_tabs(disciplines_res, key="tabs_res"):
+                with tab:
+                    statuses_d = statuses.xs(d, level="discipline")
+                    people_present = paginate(roster.ordered(statuses_d.index), key=f"res_page_{d}")
+                    if not people_present:
+                        st.info("Aucune personne pour cette discipline.")
+                        continue
 
-                        counts = (
-                            sub[medal_col]
-                            .value_counts(dropna=False)
-                            .reindex(medal_axis, fill_value=0)
-                            .reset_index()
-                        )
-                        counts.columns = ["Médaille", "Nombre"]
-
-                        color_map = {
-                            low_label: "#FFFFFF",
-                            "Bronze": "#8C6239",
-                            "Argent": "#B0B0B0",
-                            "Vermeil": "#87CEFA",
-                            "Or": "#FFD700",
-                        }
-
-                        fig_medals = px.bar(
-                            counts,
-                            x="Médaille",
-                            y="Nombre",
-                            color="Médaille",
-                            text="Nombre",
-                            category_orders={"Médaille": medal_axis},
-                            color_discrete_map=color_map,
-                        )
-                        fig_medals.update_layout(
-                            showlegend=False,
-                            height=240,
-                            margin=dict(l=0, r=0, t=10, b=0),
-                        )
-                        fig_medals.update_traces(
-                            marker_line_width=1,
-                            marker_line_color="rgba(255,255,255,0.35)",
+                    low_label = "Cabri" if is_chamois(d) else "Fléchette"
+                    medal_axis = [low_label, "Bronze", "Argent", "Vermeil", "Or"]
+                    counts_d = medals.xs(d, level="discipline").reindex(columns=medal_axis, fill_value=0)
+
+                    cols_people = st.columns(3)
+
+                    for i, p in enumerate(people_present):
+                        with cols_people[i % 3]:
+                            # --- Stats ---
+                            row = statuses_d.loc[p]
+                            total, finished = int(row["n"]), int(row["finished"])
+                            abandons, disq, dns = int(row["dnf"]), int(row["dsq"]), int(row["dns"])
+
+                            # Bloc à hauteur fixe (SANS indentation -> pas de "code block")
+                            extra_lines = []
+                            if abandons > 0:
+                                extra_lines.append(f"<div>Abandons : <b>{abandons}</b></div>")
+                            if disq > 0:
+                                extra_lines.append(f"<div>Disqualifications : <b>{disq}</b></div>")
+                            if dns > 0:
+                                extra_lines.append(f"<div>Départs non pris : <b>{dns}</b></div>")
+
+                            stats_html = (
+                                "<div style='min-height:140px;'>"
+                                f"<div style='font-size:1.1rem;font-weight:700;margin-bottom:0.35rem;'>{p}</div>"
+                                f"<div>Participations : <b>{total}</b></div>"
+                                f"<div>Épreuves finies : <b>{finished}</b></div>"
+                                + "".join(extra_lines)
+                                + "</div>"
+                            )
+
+                            st.markdown(stats_html, unsafe_allow_html=True)
+
+                            # =========================
+                            # Histogramme médailles (Cabri/Fléchette -> Or)
+                            # =========================
+                            if not facet_medals:
+                                fig_medals = cached_figure(
+                                    ("resultats.medailles", d, p),
+                                    f,
+                                    lambda: _medal_bar(
+                                        counts_d.loc[p].rename_axis("Médaille").reset_index(name="Nombre"),
+                                        medal_axis,
+                                        height=240,
+                                    ),
+                                )
+                                st.plotly_chart(
+                                    fig_medals, use_container_width=True, config={"displayModeBar": False}, key=f"medals_{d}_{p}"
+                                )
+
+                    if facet_medals:
+                        fig_medals = cached_figure(
+                            ("resultats.medailles", d),
+                            f,
+                            lambda: _medal_facets(counts_d.loc[people_present], medal_axis),
+                            tuple(people_present),
                         )
+                        st.plotly_chart(fig_medals, use_container_width=True, config={"displayModeBar": False}, key=f"medals_{d}")
 
-                        st.plotly_chart(fig_medals, use_container_width=True, config={"displayModeBar": False})
 
+@st.fragment
+def _statistiques_section(f: pd.DataFrame) -> None:
     # =========================
     # Statistiques
     # =========================
-    st.divider()
-    st.subheader("Statistiques")
-
-    now = pd.Timestamp.now(tz=None)
-    cutoff_3y = now - pd.DateOffset(years=3)
-
-    def _mean_or_none(s: pd.Series) -> float | None:
-        s = pd.to_numeric(s, errors="coerce").dropna()
-        return float(s.mean()) if not s.empty else None
-
-    def _fmt_num(x: float | None, digits: int = 2) -> str:
-        return "—" if x is None else f"{x:.{digits}f}"
-
-    def _fmt_pct(x: float | None, digits: int = 1) -> str:
-        return "—" if x is None else f"{x:.{digits}f}%"
+    with fragment_span("comparaison.statistiques"):
+        st.divider()
+        st.subheader("Statistiques")
 
-    stats_src = f.copy()
+        now = pd.Timestamp.now(tz=None)
+        # event_dt est à minuit : arrondir au jour suivant ne change pas le filtre
+        # et rend la clé de mémorisation stable sur la journée
+        cutoff_3y = (now - pd.DateOffset(years=3)).ceil("D")
 
-    if stats_src.empty:
-        st.info("Aucune donnée.")
-    else:
-        disciplines_stats = sorted(
-            stats_src["discipline"].dropna().unique().tolist(),
-            key=lambda x: (0 if is_fleche(x) else 1, str(x)),
-        )
+        def _num_or_none(x) -> float | None:
+            return None if pd.isna(x) else float(x)
 
-        tabs_stats = st.tabs([discipline_label(d) for d in disciplines_stats])
+        def _fmt_num(x: float | None, digits: int = 2) -> str:
+            return "—" if x is None else f"{x:.{digits}f}"
 
-        for tab, d in zip(tabs_stats, disciplines_stats):
-            with tab:
-                df_d = stats_src[stats_src["discipline"] == d].copy()
-                if df_d.empty:
-                    st.info("Aucune donnée pour cette discipline.")
-                    continue
+        def _fmt_pct(x: float | None, digits: int = 1) -> str:
+            return "—" if x is None else f"{x:.{digits}f}%"
 
-                people_present = [p for p in PEOPLE if not df_d[df_d["person"] == p].empty]
-                if not people_present:
-                    st.info("Aucune personne pour cette discipline.")
-                    continue
-
-                for p in people_present:
-                    sub = df_d[df_d["person"] == p].copy()
-                    if sub.empty:
+        if f.empty:
+            st.info("Aucune donnée.")
+        else:
+            # Toutes les stats (personne, discipline) en une passe, mémorisée par état des filtres
+            stats = memoized("statistiques", f, lambda: discipline_stats(f, cutoff_3y), cutoff_3y)
+            stats_by_discipline = {
+                d: rows.droplevel("discipline") for d, rows in stats.groupby(level="discipline", observed=True, sort=False)
+            }
+
+            disciplines_stats = sorted(stats_by_discipline, key=discipline_sort_key)
+
+            for tab, d in _lazy_tabs(disciplines_stats, key="tabs_stats"):
+                with tab:
+                    stats_d = stats_by_discipline[d]
+                    people_present = paginate(roster.ordered(stats_d.index), key=f"stats_page_{d}")
+                    if not people_present:
+                        st.info("Aucune personne pour cette discipline.")
                         continue
 
-                    # -------------------------
-                    # Points OPEN (pt_cse)
-                    # -------------------------
-                    sub_pt = sub[sub["pt_cse"].notna()].copy()
+                    for p in people_present:
+                        row = {k: _num_or_none(v) for k, v in stats_d.loc[p].items()}
 
-                    pt_mean_all = _mean_or_none(sub_pt["pt_cse"])
-                    pt_mean_top5 = _mean_or_none(sub_pt.nsmallest(5, "pt_cse")["pt_cse"]) if len(sub_pt) > 0 else None
+                        # -------------------------
+                        # Render (2 lignes x 4 colonnes)
+                        # -------------------------
+                        st.markdown(f"### {p}")
 
-                    sub_3y_pt = sub_pt[sub_pt["event_dt"].notna() & (sub_pt["event_dt"] >= cutoff_3y)]
-                    pt_mean_3y = _mean_or_none(sub_3y_pt["pt_cse"])
+                        stats_rows = [
+                            {
+                                "Stat": "Points OPEN",
+                                "Moyenne totale": _fmt_num(row["pt_mean"], 2),
+                                "Moyenne top 5": _fmt_num(row["pt_top5"], 2),
+                                "Moyenne ≤ 3 ans": _fmt_num(row["pt_3y"], 2),
+                                "Record": _fmt_num(row["pt_record"], 2),
+                            },
+                            {
+                                "Stat": "Centile",
+                                "Moyenne totale": _fmt_pct(row["c_mean"], 1),
+                                "Moyenne top 5": _fmt_pct(row["c_top5"], 1),
+                                "Moyenne ≤ 3 ans": _fmt_pct(row["c_3y"], 1),
+                                "Record": _fmt_pct(row["c_best"], 1),
+                            },
+                        ]
 
-                    pt_record = float(sub_pt["pt_cse"].min()) if len(sub_pt) > 0 else None
+                        st.dataframe(pd.DataFrame(stats_rows), width="stretch", hide_index=True)
+                        st.markdown("---")
 
-                    # -------------------------
-                    # Centile (rank_relative * 100)
-                    # -------------------------
-                    sub_rr = sub[sub["rank_relative"].notna()].copy()
-                    sub_rr["centile"] = pd.to_numeric(sub_rr["rank_relative"], errors="coerce") * 100
 
-                    c_mean_all = _mean_or_none(sub_rr["centile"])
+@st.fragment
+def _recentes_section(f: pd.DataFrame) -> None:
+    # =========================
+    # Performances récentes (≤ 3 ans)
+    # =========================
+    with fragment_span("comparaison.recentes"):
+        st.divider()
+        st.subheader("Performances récentes (≤ 3 ans)")
 
-                    # Top5 = basé sur les 5 meilleures courses en pt_cse (si possible), puis moyenne centile sur ces courses
-                    if len(sub_pt) > 0 and sub_rr["centile"].notna().any():
-                        top5_idx = sub_pt.nsmallest(5, "pt_cse").index
-                        c_mean_top5 = _mean_or_none(sub_rr.loc[sub_rr.index.intersection(top5_idx), "centile"])
-                    else:
-                        c_mean_top5 = None
+        today = pd.Timestamp.today().normalize()
+        cutoff = today - pd.DateOffset(years=3)
 
-                    sub_rr_3y = sub_rr[sub_rr["event_dt"].notna() & (sub_rr["event_dt"] >= cutoff_3y)]
-                    c_mean_3y = _mean_or_none(sub_rr_3y["centile"])
+        recent_blocks = memoized("recentes", f, lambda: _split_by_discipline_person(recent_table(f, cutoff)), cutoff)
 
-                    # Record centile = meilleur = plus petit
-                    c_best = float(sub_rr["centile"].min()) if sub_rr["centile"].notna().any() else None
+        if not recent_blocks:
+            st.info("Aucune course dans les 3 dernières années.")
+        else:
+            disciplines_recent = sorted(recent_blocks, key=discipline_sort_key)
 
-                    # -------------------------
-                    # Render (2 lignes x 4 colonnes)
-                    # -------------------------
-                    st.markdown(f"### {p}")
+            for tab, d in _lazy_tabs(disciplines_recent, key="tabs_recent"):
+                with tab:
+                    for p in paginate(roster.ordered(recent_blocks[d]), key=f"recent_page_{d}"):
+                        recent_df = recent_blocks[d][p]
+                        st.markdown(f"### {p}")
+                        st.dataframe(recent_df, width="stretch", hide_index=True)
 
-                    stats_rows = [
-                        {
-                            "Stat": "Points OPEN",
-                            "Moyenne totale": _fmt_num(pt_mean_all, 2),
-                            "Moyenne top 5": _fmt_num(pt_mean_top5, 2),
-                            "Moyenne ≤ 3 ans": _fmt_num(pt_mean_3y, 2),
-                            "Record": _fmt_num(pt_record, 2),
-                        },
-                        {
-                            "Stat": "Centile",
-                            "Moyenne totale": _fmt_pct(c_mean_all, 1),
-                            "Moyenne top 5": _fmt_pct(c_mean_top5, 1),
-                            "Moyenne ≤ 3 ans": _fmt_pct(c_mean_3y, 1),
-                            "Record": _fmt_pct(c_best, 1),
-                        },
-                    ]
-
-                    st.dataframe(pd.DataFrame(stats_rows), width="stretch", hide_index=True)
-                    st.markdown("---")
 
+@st.fragment
+def _top5_section(f: pd.DataFrame, discipline_sel: list[str]) -> None:
     # =========================
-    # Performances récentes (≤ 3 ans)
+    # Top 5 performances
     # =========================
-    st.divider()
-    st.subheader("Performances récentes (≤ 3 ans)")
-
-    today = pd.Timestamp.today().normalize()
-    cutoff = today - pd.DateOffset(years=3)
-
-    recent = f.copy()
-
-    # Filtre date (event_dt prioritaire, fallback event_date)
-    if "event_dt" in recent.columns:
-        recent = recent[recent["event_dt"].notna()]
-    elif "event_date" in recent.columns:
-        recent["event_dt"] = pd.to_datetime(recent["event_date"], errors="coerce")
-        recent = recent[recent["event_dt"].notna()]
-    else:
-        recent = recent.iloc[0:0]
-
-    recent = recent[recent["event_dt"] >= cutoff]
-
-    if recent.empty:
-        st.info("Aucune course dans les 3 dernières années.")
-    else:
-        disciplines_recent = sorted(
-            recent["discipline"].dropna().unique().tolist(),
-            key=lambda x: (0 if is_fleche(x) else 1, str(x)),
-        )
+    with fragment_span("comparaison.top5"):
+        st.divider()
+        st.subheader("Top 5 performances")
 
-        tabs_recent = st.tabs([discipline_label(d) for d in disciplines_recent])
+        disciplines_sorted = sorted(discipline_sel, key=discipline_sort_key)
+        top_blocks = memoized("top5", f, lambda: _split_by_discipline_person(top5_table(f)))
 
-        for tab, d in zip(tabs_recent, disciplines_recent):
+        for tab, d in _lazy_tabs(disciplines_sorted, key="tabs_top5"):
             with tab:
-                df_d = recent[recent["discipline"] == d].copy()
-                if df_d.empty:
-                    st.info("Aucun résultat récent pour cette discipline.")
+                if d not in top_blocks:
+                    st.info("Aucun résultat avec Pt Cse pour cette discipline.")
                     continue
 
-                # Tri : récent -> ancien (puis event_num)
-                df_d = df_d.sort_values(
-                    ["event_dt", "season_num", "event_num"],
-                    ascending=[False, False, False],
-                )
-
-                for p in PEOPLE:
-                    df_p = df_d[df_d["person"] == p].copy()
-                    if df_p.empty:
-                        continue
-
-                    rows = []
-                    for _, r in df_p.iterrows():
-                        pt = r.get("pt_cse", None)
-                        rank = r.get("rank", None)
-                        participants = r.get("participants_count", None)
-
-                        # Statut (si pas de points)
-                        status = str(r.get("status", "") or "").upper()
-                        is_no_points = (pt is None) or (pd.isna(pt))
-
-                        if is_no_points:
-                            if status == "DNF":
-                                pt_txt = "Abandon"
-                                classement = "Abandon"
-                            elif status == "DNS":
-                                pt_txt = "Départ non pris"
-                                classement = "Départ non pris"
-                            elif status == "DSQ":
-                                pt_txt = "Disqualifié"
-                                classement = "Disqualifié"
-                            else:
-                                pt_txt = "—"
-                                classement = "—"
-                        else:
-                            pt_txt = f"{float(pt):.2f}"
-                            if pd.notna(rank) and pd.notna(participants):
-                                classement = f"{int(rank)}/{int(participants)}"
-                            else:
-                                classement = "—"
-
-                        rows.append(
-                            {
-                                "Saison": (
-                                    int(r["season_num"])
-                                    if pd.notna(r.get("season_num", None))
-                                    else r.get("season", "—")
-                                ),
-                                "Station": r.get("station") or "Inconnue",
-                                "Point course": pt_txt,
-                                "Médaille": r.get("medal_simple", r.get("medal", "Rien")),
-                                "Classement": classement,
-                            }
-
-                        )
-
+                for p in paginate(roster.ordered(top_blocks[d]), key=f"top5_page_{d}"):
+                    top_df = top_blocks[d][p]
                     st.markdown(f"### {p}")
-                    recent_df = pd.DataFrame(rows)
-
-                    if recent_df.empty:
-                        st.info("Aucun résultat exploitable.")
-                    else:
-                        st.dataframe(recent_df, width="stretch", hide_index=True)
+                    st.dataframe(top_df, width="stretch", hide_index=True)
 
 
+@st.fragment
+def _face_a_face_section(f: pd.DataFrame, discipline_sel: list[str]) -> None:
     # =========================
-    # Top 5 performances
+    # Face-à-face (courses communes)
     # =========================
-    st.divider()
-    st.subheader("Top 5 performances")
-
-    disciplines_sorted = sorted(discipline_sel, key=lambda x: (0 if is_fleche(x) else 1, str(x)))
-    tabs = st.tabs([discipline_label(d) for d in disciplines_sorted])
-
-    for tab, d in zip(tabs, disciplines_sorted):
-        with tab:
-            df_d = f[(f["discipline"] == d) & (f["pt_cse"].notna())].copy()
-            if df_d.empty:
-                st.info("Aucun résultat avec Pt Cse pour cette discipline.")
-                continue
-
-            for p in PEOPLE:
-                df_p = df_d[df_d["person"] == p].copy()
-                if df_p.empty:
+    with fragment_span("comparaison.face_a_face"):
+        st.divider()
+        st.subheader("Face-à-face")
+        st.caption(
+            "Ligne contre colonne sur les courses communes : victoires–défaites / courses communes "
+            "(écart moyen de Pt Cse, négatif = ligne devant). Ex æquo et courses où aucun des deux "
+            "n'est classé comptent dans les courses, ni en victoire ni en défaite."
+        )
+
+        disciplines_sorted = sorted(discipline_sel, key=discipline_sort_key)
+        matrices = memoized("face_a_face", f, lambda: _head_to_head_matrices(head_to_head(f)))
+
+        for tab, d in _lazy_tabs(disciplines_sorted, key="tabs_h2h"):
+            with tab:
+                if d not in matrices:
+                    st.info("Aucune course en commun pour cette discipline.")
                     continue
 
-                # Tri "invisible" : à points égaux, on départage par la date réelle
-                df_p = df_p.copy()
-                if "event_dt" not in df_p.columns:
-                    # fallback si jamais event_dt n'existe pas
-                    df_p["event_dt"] = pd.to_datetime(df_p.get("event_date"), errors="coerce")
-
-                top5 = df_p.sort_values(
-                    ["pt_cse", "event_dt", "season_num", "event_num"],
-                    ascending=[True, False, True, True],  # points meilleurs d'abord, puis plus récent d'abord
-                ).head(5)
-
-                rows = []
-                for _, r in top5.iterrows():
-                    rank = r.get("rank", None)
-                    participants = r.get("participants_count", None)
-
-                    if pd.notna(rank) and pd.notna(participants):
-                        classement = f"{int(rank)}/{int(participants)}"
-                    else:
-                        classement = "—"
-
-                    rows.append(
-                        {
-                            "Saison": int(r["season_num"]) if pd.notna(r["season_num"]) else r["season"],
-                            "Station": r.get("station") or "Inconnue",
-                            "Points course": float(r["pt_cse"]) if pd.notna(r["pt_cse"]) else None,
-                            "Médaille": r["medal_simple"],
-                            "Classement": classement,
-                        }
-                    )
-
-                st.markdown(f"### {p}")
-                top_df = pd.DataFrame(rows)
-
-                if top_df.empty:
-                    st.info("Aucun résultat exploitable.")
-                else:
-                    st.dataframe(top_df, width="stretch", hide_index=True)
+                people = paginate(roster.ordered(matrices[d].index), key=f"h2h_page_{d}")
+                st.dataframe(_head_to_head_cells(matrices[d], people), width="stretch")
@@ -2,26 +2,181 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 
-from core.config import MERGED_ORDER, PEOPLE
+from core import roster
+from core.age_grid import load_age_grid
+from core.config import AGE_STEP, DOWNSAMPLE_POINTS, MERGED_ORDER, WEBGL_POINTS
 from core.metrics import (
     ordered_medal_labels_for_axis,
-    is_fleche,
     discipline_label,
+    discipline_sort_key,
     medal_label_discipline,
 )
+from core.aggregations import medal_recap
+from core.downsample import downsample_series
+from core.field import load_field
+from core.filters import FULL_HISTORY_ATTR
+from core.memo import cached_figure, memoized
+from core.pages.pagination import paginate
+from core.profiling import fragment_span, span
+
+
+def _points_hover(evo: pd.DataFrame, field: bool = False) -> pd.Series:
+    # Détails de survol pré-formatés en une seule chaîne par point (customdata compact),
+    # mêmes champs que le survol des courbes SVG
+    def txt(col: str, digits: int | None = None) -> pd.Series:
+        values = evo[col] if digits is None else evo[col].round(digits)
+        return values.astype("string").fillna("—")
+
+    classement = (txt("rank") + "/" + txt("participants_count")).str.replace("—/—", "—", regex=False)
+    hover = (
+        txt("event_date") + " · " + txt("course_label")
+        + "<br>" + classement + " · " + txt("medal_label")
+        + "<br>" + txt("pdf_file") + " · " + txt("age_years", 1) + " ans"
+    )
+    if field:
+        rang = evo["rang_champ"].astype("Int64").astype("string").fillna("—")
+        hover = hover + "<br>" + txt("pt_cse", 2) + " pts · rang " + rang + " · force du champ " + txt("force_champ", 2)
+    return hover
+
+
+def _points_fig_webgl(evo: pd.DataFrame, x_col: str, y_col: str, labels: dict, unit: str, field: bool = False, **kwargs):
+    """
+    Variante des courbes de points pour les longues séries : traces Scattergl,
+    séries réduites par LTTB (records personnels toujours gardés), survol via customdata.
+    """
+    records = evo["pt_cse"] == evo.groupby(["person", "discipline"], observed=True)["pt_cse"].cummin()
+    evo = downsample_series(evo, x_col, y_col, ["person", "discipline"], DOWNSAMPLE_POINTS, keep=records)
+    evo = evo.assign(hover=_points_hover(evo, field))
+
+    fig = px.line(
+        evo,
+        x=x_col,
+        y=y_col,
+        color="person",
+        markers=True,
+        custom_data=["hover"],
+        labels=labels,
+        render_mode="webgl",
+        **kwargs,
+    )
+    fig.update_traces(hovertemplate=f"<b>%{{y:.2f}}</b> {unit}<br>%{{customdata[0]}}<extra>%{{fullData.name}}</extra>")
+    return fig
+
+
+def _box(lines: list[str], cls: str) -> str:
+    # Si une discipline n’a aucune course cette saison => box vide (mais la box existe)
+    if not lines:
+        return f'<div class="box {cls}"></div>'
+    items = "".join([f'<div class="m">{v}</div>' for v in lines])
+    return f'<div class="box {cls}">{items}</div>'
+
+
+def _recap_rows_html(base: pd.DataFrame, seasons: list[int], people_cols: list[str], best_season: bool) -> str:
+    """Lignes <tr> du récap des médailles, en une passe sur les cases agrégées."""
+    recap = medal_recap(base, best_season)
+    if best_season:
+        cells = {k: f'<div class="one">{lbl}</div>' for k, lbl in recap["label"].items()}
+    else:
+        cells = {
+            k: _box(fle, "top") + _box(cha, "bot")
+            for k, fle, cha in zip(recap.index, recap["fleche"], recap["chamois"])
+        }
+
+    rows_html = []
+    for s in seasons:
+        tds = []
+        for p in people_cols:
+            content = cells.get((s, p), "")
+            if content:
+                cell_html = f'<div class="cell">{content}</div>'
+            else:
+                cell_html = ""  # pas de participation => rien du tout
+            tds.append(f"<td>{cell_html}</td>")
+        rows_html.append(f'<tr><td class="season">{s}</td>{"".join(tds)}</tr>')
+    return "".join(rows_html)
+
+
+def _render_age_grid(f: pd.DataFrame, disciplines: list[str], toggles: tuple) -> None:
+    st.subheader("Records à âge égal")
+    st.caption("Record de points de chacun à chaque âge (tout l'historique, pas de la grille : "
+               f"{AGE_STEP:g} an), et écart au meilleur de la discipline au même âge.")
+
+    grid = load_age_grid()
+    people = roster.ordered(f["person"].dropna().unique())
+    series = grid.select(disciplines, people)
+    default_age = grid.common_age(disciplines, people)
+    if default_age is None:
+        st.info("Aucune donnée.")
+        return
+
+    lo, hi = float(series["age"].min()), float(series["age"].max())
+    if lo == hi:
+        # un seul âge sur la grille : st.slider refuse min_value == max_value
+        age = lo
+        st.caption(f"Âge : {age:g} ans")
+    else:
+        age = st.slider(
+            "Âge",
+            min_value=lo,
+            max_value=hi,
+            value=default_age,
+            step=grid.step,
+            key="age_grid_age",
+        )
+    at = grid.at(age, disciplines, people).reset_index()
+    at = at.sort_values("gap").sort_values("discipline", key=lambda c: c.astype(str).map(discipline_sort_key), kind="stable")
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Discipline": at["discipline"].map(discipline_label),
+                "Personne": at["person"],
+                "Record": at["record"].round(2),
+                "Dernier résultat": at["last"].round(2),
+                "Écart au meilleur": at["gap"].round(2),
+            }
+        ),
+        width="stretch",
+        hide_index=True,
+    )
+    missing = [p for p in people if p not in set(at["person"])]
+    if missing:
+        st.caption(f"Pas de données à {age:g} ans : {', '.join(missing)}.")
+
+    def build_age_fig():
+        return px.line(
+            series,
+            x="age",
+            y="record",
+            color="person",
+            line_dash="discipline",
+            line_shape="hv",
+            labels={"age": "Âge", "record": "Record (points course)"},
+        )
 
+    st.plotly_chart(cached_figure("evolution.age", f, build_age_fig, *toggles), use_container_width=True)
 
+
+@st.fragment
 def render_evolution_page(f: pd.DataFrame, discipline_sel: list[str]) -> None:
+    # Fragment : les bascules de la page ne relancent que la page (pas load_data ni les filtres)
+    with fragment_span("evolution"):
+        _render_evolution(f, discipline_sel)
+
+
+def _render_evolution(f: pd.DataFrame, discipline_sel: list[str]) -> None:
     st.subheader("Évolution")
 
     # -------------------------
     # Controls (top)
     # -------------------------
-    disciplines_sorted = sorted(discipline_sel, key=lambda x: (0 if is_fleche(x) else 1, str(x)))
+    disciplines_sorted = sorted(discipline_sel, key=discipline_sort_key)
     separer_disciplines = (len(disciplines_sorted) > 1) and st.toggle("Séparer les disciplines", value=True)
     
     age_equal = st.toggle("À âge égal", value=False)
 
+    # Centile parmi tous les classés de chaque course (core.field), au lieu des points
+    field_centile = st.toggle("Centile dans le champ complet", value=False)
+
     def _on_best_season_change():
         if st.session_state.get("best_season", False):
             st.session_state["best_ever"] = False
@@ -44,155 +199,194 @@ def render_evolution_page(f: pd.DataFrame, discipline_sel: list[str]) -> None:
         on_change=_on_best_ever_change,
     )
 
-    evo = f[f["pt_cse"].notna()].copy()
-
-    # Best per season PER PERSON + PER DISCIPLINE
-    if best_season:
-        evo = evo.dropna(subset=["season_num"]).copy()
-        evo = evo.loc[evo.groupby(["person", "discipline", "season_num"])["pt_cse"].idxmin()].copy()
+    # Clé des figures : l'état des filtres (porté par f) plus les bascules de la page
+    toggles = (separer_disciplines, age_equal, best_season, best_ever, field_centile)
 
     # X axis
     if age_equal:
         x_col = "age_years"
         x_label = "Âge"
-        evo = evo.sort_values([x_col, "discipline_ord", "person"], ascending=[True, True, True])
     else:
         x_col = "event_dt"
         x_label = "Saison"
+
+    def _prepare() -> pd.DataFrame:
+        evo = f[f["pt_cse"].notna()].copy()
+
+        # Best per season PER PERSON + PER DISCIPLINE (drapeau précalculé au chargement)
+        if best_season:
+            evo = evo[evo["season_best"]]
+
         evo = evo.sort_values([x_col, "discipline_ord", "person"], ascending=[True, True, True])
 
-    # Keep only successive personal improvements (records) per discipline
-    if best_ever:
-        evo = evo.sort_values([x_col, "discipline_ord", "person"], ascending=[True, True, True]).copy()
-        evo["best_so_far"] = evo.groupby(["person", "discipline"])["pt_cse"].cummin()
-        evo = evo[evo["pt_cse"] == evo["best_so_far"]].copy()
-        evo = evo.drop(columns=["best_so_far"])
+        # Keep only successive personal improvements (records) per discipline
+        if best_ever:
+            # Le drapeau running_record porte sur tout l'historique : si la fenêtre
+            # d'années coupe le début (ou si l'âge manque), on recalcule sur evo
+            if f.attrs.get(FULL_HISTORY_ATTR, False) and not (age_equal and evo["age_years"].isna().any()):
+                evo = evo[evo["running_record"]]
+            else:
+                evo = evo.copy()
+                evo["best_so_far"] = evo.groupby(["person", "discipline"], observed=True)["pt_cse"].cummin()
+                evo = evo[evo["pt_cse"] == evo["best_so_far"]].copy()
+                evo = evo.drop(columns=["best_so_far"])
+
+        if field_centile:
+            evo = evo.join(load_field().place(evo))
+        return evo
+
+    with span("evolution.preparation"):
+        evo = memoized("evolution.evo", f, _prepare, age_equal, best_season, best_ever, field_centile)
+
+    if field_centile:
+        y_col, y_label, y_unit = "centile_champ", "Centile (champ complet)", "e centile"
+    else:
+        y_col, y_label, y_unit = "pt_cse", "Points course", "pts"
 
     # -------------------------
     # Points course
     # -------------------------
-    st.subheader("Points course")
-
-    if separer_disciplines:
-        c1, c2 = st.columns(2)
-        for col, d in zip((c1, c2), disciplines_sorted[:2]):
-            with col:
-                evo_d = evo[evo["discipline"] == d].copy()
-                fig = px.line(
-                    evo_d,
-                    x=x_col,
-                    y="pt_cse",
-                    color="person",
-                    markers=True,
-                    hover_data=[
-                        "event_date",
-                        "course_label",
-                        "rank",
-                        "participants_count",
-                        "medal_label",
-                        "pdf_file",
-                        "age_years",
-                    ],
-                    labels={x_col: x_label, "pt_cse": "Points course"},
-                    title=discipline_label(d),
-                )
+    with span("evolution.points"):
+        st.subheader(y_label)
+
+        def build_points_fig(evo_sub: pd.DataFrame, **kwargs):
+            labels = {x_col: x_label, y_col: y_label}
+            if len(evo_sub) > WEBGL_POINTS:
+                fig = _points_fig_webgl(evo_sub, x_col, y_col, labels, y_unit, field=field_centile, **kwargs)
                 if not age_equal:
                     fig.update_xaxes(tickformat="%Y")
-                st.plotly_chart(fig, use_container_width=True)
-    else:
-        fig1 = px.line(
-            evo,
-            x=x_col,
-            y="pt_cse",
-            color="person",
-            line_dash="discipline",
-            markers=True,
-            hover_data=[
-                "event_date",
-                "course_label",
-                "rank",
-                "participants_count",
-                "medal_label",
-                "pdf_file",
-                "age_years",
-            ],
-            labels={x_col: x_label, "pt_cse": "Points course"},
-        )
+                return fig
+
+            fig = px.line(
+                evo_sub,
+                x=x_col,
+                y=y_col,
+                color="person",
+                markers=True,
+                hover_data=[
+                    "event_date",
+                    "course_label",
+                    "rank",
+                    "participants_count",
+                    "medal_label",
+                    "pdf_file",
+                    "age_years",
+                    *(["pt_cse", "rang_champ", "force_champ"] if field_centile else []),
+                ],
+                labels=labels,
+                **kwargs,
+            )
+            if not age_equal:
+                fig.update_xaxes(tickformat="%Y")
+            return fig
 
-        if not age_equal:
-            fig1.update_xaxes(tickformat="%Y")
+        if separer_disciplines:
+            c1, c2 = st.columns(2)
+            for col, d in zip((c1, c2), disciplines_sorted[:2]):
+                with col:
+                    fig = cached_figure(
+                        ("evolution.points", d),
+                        f,
+                        lambda: build_points_fig(evo[evo["discipline"] == d].copy(), title=discipline_label(d)),
+                        *toggles,
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+        else:
+            fig1 = cached_figure(
+                "evolution.points",
+                f,
+                lambda: build_points_fig(evo, line_dash="discipline"),
+                *toggles,
+            )
+            st.plotly_chart(fig1, use_container_width=True)
 
-        st.plotly_chart(fig1, use_container_width=True)
+    # -------------------------
+    # Records à âge égal (grille d'âges commune, cf. core.age_grid)
+    # -------------------------
+    if age_equal:
+        with span("evolution.age"):
+            _render_age_grid(f, disciplines_sorted, toggles)
 
     # -------------------------
     # Médailles
     # -------------------------
-    st.subheader("Médailles")
-
-    def build_medal_fig_by_discipline(evo_sub: pd.DataFrame, discipline_name: str):
-        evo_sub = evo_sub.copy()
-
-        medal_col = "medal_simple" if "medal_simple" in evo_sub.columns else "medal"
-        evo_sub[medal_col] = evo_sub[medal_col].fillna("Rien")
-
-        # Recompute label by discipline (évite le mélange Flèche/Chamois sur l’axe Y)
-        evo_sub["medal_display"] = evo_sub[medal_col].apply(lambda m: medal_label_discipline(discipline_name, m))
-        category_order = ordered_medal_labels_for_axis(discipline_name)
-
-        fig = px.line(
-            evo_sub,
-            x=x_col,
-            y="medal_display",
-            color="person",
-            markers=True,
-            hover_data=["event_date", "course_label", "pt_cse", "pdf_file", "age_years"],
-            labels={x_col: x_label, "medal_display": "Médaille"},
-            category_orders={"medal_display": category_order},
-            title=discipline_label(discipline_name),
-        )
-        fig.update_yaxes(autorange="reversed")
-        if not age_equal:
-            fig.update_xaxes(tickformat="%Y")
-        return fig
-
-    def build_medal_fig_merged(evo_sub: pd.DataFrame):
-        evo_sub = evo_sub.copy()
-        fig = px.line(
-            evo_sub,
-            x=x_col,
-            y="medal_label_merged",
-            color="person",
-            line_dash="discipline",
-            markers=True,
-            hover_data=["event_date", "course_label", "pt_cse", "pdf_file", "age_years"],
-            labels={x_col: x_label, "medal_label_merged": "Médaille"},
-            category_orders={"medal_label_merged": MERGED_ORDER},
-            title="Flèche + Chamois",
-        )
-        fig.update_yaxes(autorange="reversed")
-        if not age_equal:
-            fig.update_xaxes(tickformat="%Y")
-        return fig
-
-    # --- Affichage des graphes ---
-    if len(disciplines_sorted) == 1:
-        d = disciplines_sorted[0]
-        evo_d = evo[evo["discipline"] == d]
-        st.plotly_chart(build_medal_fig_by_discipline(evo_d, d), use_container_width=True)
-    else:
-        d1, d2 = disciplines_sorted[0], disciplines_sorted[1]
+    with span("evolution.medailles"):
+        st.subheader("Médailles")
+
+        def build_medal_fig_by_discipline(evo_sub: pd.DataFrame, discipline_name: str):
+            evo_sub = evo_sub.copy()
+
+            medal_col = "medal_simple" if "medal_simple" in evo_sub.columns else "medal"
+            evo_sub[medal_col] = evo_sub[medal_col].fillna("Rien")
+
+            # Recompute label by discipline (évite le mélange Flèche/Chamois sur l’axe Y)
+            evo_sub["medal_display"] = evo_sub[medal_col].apply(lambda m: medal_label_discipline(discipline_name, m))
+            category_order = ordered_medal_labels_for_axis(discipline_name)
+
+            fig = px.line(
+                evo_sub,
+                x=x_col,
+                y="medal_display",
+                color="person",
+                markers=True,
+                hover_data=["event_date", "course_label", "pt_cse", "pdf_file", "age_years"],
+                labels={x_col: x_label, "medal_display": "Médaille"},
+                category_orders={"medal_display": category_order},
+                title=discipline_label(discipline_name),
+            )
+            fig.update_yaxes(autorange="reversed")
+            if not age_equal:
+                fig.update_xaxes(tickformat="%Y")
+            return fig
+
+        def build_medal_fig_merged(evo_sub: pd.DataFrame):
+            evo_sub = evo_sub.copy()
+            fig = px.line(
+                evo_sub,
+                x=x_col,
+                y="medal_label_merged",
+                color="person",
+                line_dash="discipline",
+                markers=True,
+                hover_data=["event_date", "course_label", "pt_cse", "pdf_file", "age_years"],
+                labels={x_col: x_label, "medal_label_merged": "Médaille"},
+                category_orders={"medal_label_merged": MERGED_ORDER},
+                title="Flèche + Chamois",
+            )
+            fig.update_yaxes(autorange="reversed")
+            if not age_equal:
+                fig.update_xaxes(tickformat="%Y")
+            return fig
+
+        # --- Affichage des graphes ---
+        def medal_fig(d: str):
+            return cached_figure(
+                ("evolution.medailles", d),
+                f,
+                lambda: build_medal_fig_by_discipline(evo[evo["discipline"] == d], d),
+                *toggles,
+            )
 
-        if separer_disciplines:
-            c1, c2 = st.columns(2)
-            with c1:
-                evo_d1 = evo[evo["discipline"] == d1]
-                st.plotly_chart(build_medal_fig_by_discipline(evo_d1, d1), use_container_width=True)
-            with c2:
-                evo_d2 = evo[evo["discipline"] == d2]
-                st.plotly_chart(build_medal_fig_by_discipline(evo_d2, d2), use_container_width=True)
+        if len(disciplines_sorted) == 1:
+            d = disciplines_sorted[0]
+            st.plotly_chart(medal_fig(d), use_container_width=True)
         else:
-            evo_mix = evo[evo["discipline"].isin([d1, d2])].copy()
-            st.plotly_chart(build_medal_fig_merged(evo_mix), use_container_width=True)
+            d1, d2 = disciplines_sorted[0], disciplines_sorted[1]
+
+            if separer_disciplines:
+                c1, c2 = st.columns(2)
+                with c1:
+                    st.plotly_chart(medal_fig(d1), use_container_width=True)
+                with c2:
+                    st.plotly_chart(medal_fig(d2), use_container_width=True)
+            else:
+                fig_mix = cached_figure(
+                    "evolution.medailles",
+                    f,
+                    lambda: build_medal_fig_merged(evo[evo["discipline"].isin([d1, d2])].copy()),
+                    *toggles,
+                )
+                st.plotly_chart(fig_mix, use_container_width=True)
 
     # -------------------------
     # Récap médailles par saison (disciplines mélangées)
@@ -201,141 +395,72 @@ def render_evolution_page(f: pd.DataFrame, discipline_sel: list[str]) -> None:
     # - Si best_season : meilleure médaille de la saison
     # - Si best_ever : on n’affiche pas le tableau
     # -------------------------
-    if not best_ever:
-
-        base = f.copy()
-        if discipline_sel:
-            base = base[base["discipline"].isin(discipline_sel)].copy()
-
-        # Colonnes = uniquement personnes réellement présentes (donc pas de colonnes “fantômes”)
-        people_cols = [p for p in PEOPLE if not base[base["person"] == p].empty]
+    with span("evolution.recap"):
+        if not best_ever:
+
+            base = f
+            if discipline_sel:
+                base = base[base["discipline"].isin(discipline_sel)]
+
+            # Colonnes = uniquement personnes réellement présentes (donc pas de colonnes “fantômes”)
+            people_cols = paginate(roster.ordered(base["person"].dropna().unique()), key="recap_page")
+
+            if base.empty or not people_cols:
+                st.info("Aucune donnée.")
+            else:
+                # saisons
+                seasons = (
+                    base["season_num"]
+                    .dropna()
+                    .astype(int)
+                    .sort_values()
+                    .unique()
+                    .tolist()
+                )
 
-        if base.empty or not people_cols:
-            st.info("Aucune donnée.")
-        else:
-            # saisons
-            seasons = (
-                base["season_num"]
-                .dropna()
-                .astype(int)
-                .sort_values()
-                .unique()
-                .tolist()
-            )
+                # --- HTML table ---
+                css = """
+                <style>
+                .med-recap-wrap { margin-top: 8px; }
+                table.med-recap { width:100%; border-collapse: collapse; }
+                table.med-recap th, table.med-recap td { padding:10px 8px; vertical-align: top; border: none; }
+                table.med-recap thead th { font-weight: 700; text-align: center; }
+                table.med-recap tbody td.season { text-align:center; font-weight:700; white-space:nowrap; }
+                table.med-recap tbody tr { border-top: 1px solid rgba(255,255,255,0.12); }
+                .cell { display:flex; flex-direction: column; gap:8px; }
+                .one { padding:8px 10px; border-radius:8px; background: rgba(255,255,255,0.04); text-align:center; }
+                .box { padding:8px 10px; border-radius:8px; background: rgba(255,255,255,0.04); }
+                .box.top { }
+                .box.bot { }
+                .m { line-height: 1.25; }
+                </style>
+                """
+
+                head = "".join([f"<th>{p}</th>" for p in people_cols])
+                # Lignes du tableau mémorisées par état des filtres et meilleur résultat de saison
+                rows_html = memoized(
+                    "recap_medailles",
+                    f,
+                    lambda: _recap_rows_html(base, seasons, people_cols, best_season),
+                    best_season,
+                    tuple(people_cols),
+                )
 
-            # Ordres d’affichage (par box)
-            FLECHE_ORDER = [
-                "Rien",
-                "Fléchette",
-                "Flèche de bronze",
-                "Flèche d'argent",
-                "Flèche de vermeil",
-                "Flèche d'or",
-            ]
-            CHAMOIS_ORDER = [
-                "Rien",
-                "Cabri",
-                "Chamois de bronze",
-                "Chamois d'argent",
-                "Chamois de vermeil",
-                "Chamois d'or",
-            ]
-            fleche_rank = {m: i for i, m in enumerate(FLECHE_ORDER)}
-            chamois_rank = {m: i for i, m in enumerate(CHAMOIS_ORDER)}
-
-            def _label_row(r) -> str:
-                # on préfère la colonne déjà calculée si elle existe
-                if "medal_label" in base.columns and pd.notna(r.get("medal_label", None)):
-                    return str(r["medal_label"])
-                return medal_label_discipline(r["discipline"], r.get("medal", None))
-
-            def _render_cell(season: int, person: str) -> str:
-                sub = base[(base["season_num"] == season) & (base["person"] == person)].copy()
-                if sub.empty:
-                    return ""  # aucune participation
-
-                if best_season:
-                    # meilleure médaille de la saison (toutes disciplines mélangées)
-                    if "medal_score_new" in sub.columns and sub["medal_score_new"].notna().any():
-                        best_row = sub.loc[sub["medal_score_new"].idxmax()]
-                    else:
-                        # fallback : si pas de score, on prend la 1ère ligne
-                        best_row = sub.iloc[0]
-                    lbl = _label_row(best_row) or "Rien"
-                    # si participation mais lbl vide -> Rien
-                    if not lbl.strip():
-                        lbl = "Rien"
-                    return f'<div class="one">{lbl}</div>'
-
-                # Sinon : tous les résultats (avec "Rien" si une participation sans médaille)
-                sub["lbl"] = sub.apply(_label_row, axis=1)
-
-                # split par discipline
-                fle = sub[sub["discipline"].apply(is_fleche)].copy()
-                cha = sub[~sub["discipline"].apply(is_fleche)].copy()
-
-                fle_list = [x for x in fle["lbl"].dropna().astype(str).tolist() if x.strip()]
-                cha_list = [x for x in cha["lbl"].dropna().astype(str).tolist() if x.strip()]
-
-                # tri par ordre demandé (puis alpha pour stabilité)
-                fle_list = sorted(fle_list, key=lambda x: (fleche_rank.get(x, 999), x))
-                cha_list = sorted(cha_list, key=lambda x: (chamois_rank.get(x, 999), x))
-
-                # Si une discipline n’a aucune course cette saison => box vide (mais la box existe)
-                def _box(lines: list[str], cls: str) -> str:
-                    if not lines:
-                        return f'<div class="box {cls}"></div>'
-                    items = "".join([f'<div class="m">{v}</div>' for v in lines])
-                    return f'<div class="box {cls}">{items}</div>'
-
-                return _box(fle_list, "top") + _box(cha_list, "bot")
-
-            # --- HTML table ---
-            css = """
-            <style>
-            .med-recap-wrap { margin-top: 8px; }
-            table.med-recap { width:100%; border-collapse: collapse; }
-            table.med-recap th, table.med-recap td { padding:10px 8px; vertical-align: top; border: none; }
-            table.med-recap thead th { font-weight: 700; text-align: center; }
-            table.med-recap tbody td.season { text-align:center; font-weight:700; white-space:nowrap; }
-            table.med-recap tbody tr { border-top: 1px solid rgba(255,255,255,0.12); }
-            .cell { display:flex; flex-direction: column; gap:8px; }
-            .one { padding:8px 10px; border-radius:8px; background: rgba(255,255,255,0.04); text-align:center; }
-            .box { padding:8px 10px; border-radius:8px; background: rgba(255,255,255,0.04); }
-            .box.top { }
-            .box.bot { }
-            .m { line-height: 1.25; }
-            </style>
-            """
-
-            head = "".join([f"<th>{p}</th>" for p in people_cols])
-            rows_html = []
-            for s in seasons:
-                tds = []
-                for p in people_cols:
-                    content = _render_cell(s, p)
-                    if content:
-                        cell_html = f'<div class="cell">{content}</div>'
-                    else:
-                        cell_html = ""  # pas de participation => rien du tout
-                    tds.append(f"<td>{cell_html}</td>")
-                rows_html.append(f'<tr><td class="season">{s}</td>{"".join(tds)}</tr>')
-
-            html = f"""
-            {css}
-            <div class="med-recap-wrap">
-            <table class="med-recap">
-                <thead>
-                <tr>
-                    <th>Saison</th>
-                    {head}
-                </tr>
-                </thead>
-                <tbody>
-                {''.join(rows_html)}
-                </tbody>
-            </table>
-            </div>
-            """
-
-            st.markdown(html, unsafe_allow_html=True)
+                html = f"""
+                {css}
+                <div class="med-recap-wrap">
+                <table class="med-recap">
+                    <thead>
+                    <tr>
+                        <th>Saison</th>
+                        {head}
+                    </tr>
+                    </thead>
+                    <tbody>
+                    {rows_html}
+                    </tbody>
+                </table>
+                </div>
+                """
+
+                st.markdown(html, unsafe_allow_html=True)
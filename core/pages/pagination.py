@@ -0,0 +1,23 @@
+import streamlit as st
+
+from core.config import PEOPLE_PER_PAGE
+
+
+def paginate(items: list, key: str, per_page: int = PEOPLE_PER_PAGE) -> list:
+    """
+    Éléments de la page choisie. Le sélecteur n'apparaît que s'il y a plusieurs
+    pages : seule la page affichée est rendue, quel que soit le nombre d'éléments.
+    """
+    if len(items) <= per_page:
+        return items
+    n_pages = -(-len(items) // per_page)
+    page = st.number_input(
+        f"Page (sur {n_pages})",
+        min_value=1,
+        max_value=n_pages,
+        value=1,
+        step=1,
+        key=key,
+    )
+    start = (int(page) - 1) * per_page
+    return items[start:start + per_page]
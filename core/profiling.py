@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from core.memo import cache_stats
+
+# Activation : variable d'environnement MIF_PROFILE=1, ou ?profile=1 dans l'URL
+PROFILE_ENV = "MIF_PROFILE"
+PROFILE_PARAM = "profile"
+
+logger = logging.getLogger("mif.profiling")
+logger.setLevel(logging.INFO)
+
+# Un run Streamlit = un thread : les spans du run courant sont locaux au thread
+_state = threading.local()
+
+
+def is_requested() -> bool:
+    if os.environ.get(PROFILE_ENV, "").strip() not in ("", "0", "false"):
+        return True
+    try:
+        return st.query_params.get(PROFILE_PARAM, "") in ("1", "true")
+    except Exception:
+        return False
+
+
+def _ensure_handler() -> None:
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+
+def start_run() -> bool:
+    """Début d'un run : active (ou non) la collecte des spans. Renvoie l'état."""
+    enabled = is_requested()
+    if enabled:
+        _ensure_handler()
+    _state.spans = [] if enabled else None
+    _state.depth = 0
+    _state.t0 = time.perf_counter()
+    return enabled
+
+
+@contextmanager
+def span(name: str):
+    """Chronomètre un bloc. Quasi gratuit quand le profilage est désactivé."""
+    spans = getattr(_state, "spans", None)
+    if spans is None:
+        yield
+        return
+
+    record = {"name": name, "depth": _state.depth, "start_ms": 0.0, "ms": 0.0}
+    spans.append(record)
+    _state.depth += 1
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        t1 = time.perf_counter()
+        _state.depth -= 1
+        record["start_ms"] = round((t0 - _state.t0) * 1000, 3)
+        record["ms"] = round((t1 - t0) * 1000, 3)
+
+
+def finish_run() -> list[dict]:
+    """
+    Fin d'un run : exporte les spans en logs JSON (une ligne par span), puis les
+    compteurs des caches nommés (une ligne par cache), et renvoie les spans.
+    """
+    spans = getattr(_state, "spans", None)
+    _state.spans = None
+    if spans is None:
+        return []
+    for record in spans:
+        logger.info(json.dumps({"event": "span", **record}, ensure_ascii=False))
+    for name, stats in cache_stats().items():
+        logger.info(json.dumps({"event": "cache", "name": name, **stats}, ensure_ascii=False))
+    return spans
+
+
+@contextmanager
+def fragment_span(name: str):
+    """
+    Span d'un fragment Streamlit. Dans un run complet, c'est un span normal ;
+    quand le fragment est relancé seul, il forme son propre run (spans exportés
+    en logs uniquement : le panneau de la barre latérale n'est pas redessiné).
+    """
+    if getattr(_state, "spans", None) is not None:
+        with span(name):
+            yield
+        return
+
+    start_run()
+    try:
+        with span(name):
+            yield
+    finally:
+        finish_run()
+
+
+def render_panel(spans: list[dict]) -> None:
+    """Panneau de debug dans la barre latérale."""
+    if not spans:
+        return
+    with st.sidebar.expander("Profilage", expanded=True):
+        table = pd.DataFrame(
+            {
+                "Section": [" " * s["depth"] + s["name"] for s in spans],
+                "ms": [s["ms"] for s in spans],
+            }
+        )
+        st.dataframe(table, hide_index=True, width="stretch")
+
+        # compteurs cumulés depuis le démarrage du serveur (toutes sessions)
+        stats = pd.DataFrame.from_dict(cache_stats(), orient="index")
+        if not stats.empty:
+            lookups = stats["hits"] + stats["misses"]
+            stats["rate"] = (stats["hits"] / lookups.where(lookups > 0)).map(lambda x: f"{x:.0%}", na_action="ignore")
+            stats = stats.rename(columns={"entries": "Entrées", "hits": "Succès", "misses": "Échecs", "rate": "Taux"})
+            st.dataframe(stats.rename_axis("Cache"), width="stretch")
@@ -0,0 +1,179 @@
+"""
+Couche de requêtes : filtre, agrégat groupé et top-k par groupe.
+
+- backend "pandas" (défaut) : la table enrichie en mémoire, filtrée par FilterIndex ;
+- backend "arrow" : select lit le fichier Arrow de la table enrichie (cache de
+  load_data) avec pyarrow.dataset, sans charger la table : seules les lignes
+  filtrées sont converties en pandas. Agrégats et top-k sont calculés par
+  pyarrow.compute sur les lignes du frame reçu, sans relire le fichier.
+
+Choix : QUERY_BACKEND dans core.config, ou MIF_QUERY_BACKEND=arrow.
+Le backend est retrouvé par la clé de filtre posée dans f.attrs ; un frame sans
+clé est calculé en pandas. Les lignes à écarter passent par `notna`.
+
+Passent par cette couche : top5_table, status_counts et medal_crosstab
+(core.aggregations). Les autres agrégats des pages travaillent sur le frame
+pandas renvoyé par select. La grille d'âges (core.age_grid), le champ complet
+(core.field) et la construction du fichier Arrow chargent encore la table
+entière : le backend Arrow allège le filtrage, pas ces index.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import streamlit as st
+
+from core.config import FILTER_CACHE_TABLES, QUERY_BACKEND
+from core.data import row_keys, enriched_file
+from core.filters import FULL_HISTORY_ATTR, FilterIndex, load_filter_index, next_version
+from core.memo import FILTER_KEY_ATTR, LRUCache, filter_key
+
+QUERY_BACKEND_ENV = "MIF_QUERY_BACKEND"
+
+# Agrégats communs aux deux backends ("size" compte les lignes, valeurs manquantes comprises)
+AGG_FUNCS = {"size", "sum", "min", "max", "mean"}
+
+# backends par version de clé de filtre (premier élément de la clé)
+_registry: dict = {}
+
+
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, index: FilterIndex | None = None):
+        self.index = index
+        self._distinct: dict = {}
+        if index is not None:
+            _registry[index.version] = self
+
+    def distinct(self, column: str) -> list:
+        """Valeurs distinctes non manquantes (table immuable : calculées une fois)."""
+        if column not in self._distinct:
+            self._distinct[column] = self._distinct_values(column)
+        return self._distinct[column]
+
+    def _distinct_values(self, column: str) -> list:
+        return self.index.df[column].dropna().unique().tolist()
+
+    def select(self, year_range: tuple[int, int], disciplines, people) -> pd.DataFrame:
+        return self.index.select(year_range, disciplines, people)
+
+    def group_agg(self, f: pd.DataFrame, keys: list[str], aggs: dict) -> pd.DataFrame:
+        """
+        Agrégat par `keys` (groupes dans l'ordre d'apparition, clés manquantes gardées).
+        aggs : {colonne de sortie: (colonne, fonction)}, fonction dans AGG_FUNCS.
+        """
+        g = f.groupby(keys, observed=True, sort=False, dropna=False)
+        return pd.DataFrame({out: getattr(g[col], func)() for out, (col, func) in aggs.items()})
+
+    def top_k(self, f: pd.DataFrame, by: list[str], order: list[tuple[str, bool]], k: int, notna=()) -> pd.DataFrame:
+        """
+        Les `k` premières lignes de chaque groupe `by` selon `order` [(colonne, croissant)],
+        parmi les lignes sans valeur manquante dans `notna`. Ordre global du tri.
+        """
+        if notna:
+            f = f.dropna(subset=list(notna))
+        f = f.sort_values([c for c, _ in order], ascending=[a for _, a in order])
+        return f[f.groupby(by, observed=True, sort=False).cumcount() < k]
+
+
+def _arrow_table(f: pd.DataFrame, columns: list[str]) -> pa.Table:
+    # colonne par colonne : Table.from_pandas tenterait de sérialiser f.attrs (clé de filtre)
+    return pa.table({c: pa.Array.from_pandas(f[c]) for c in columns})
+
+
+class ArrowBackend(PandasBackend):
+    name = "arrow"
+
+    def __init__(self, path: str, maxsize: int = 64):
+        self.dataset = ds.dataset(path, format="ipc")
+        self.version = next_version()
+        self._memo = LRUCache(maxsize, maxweight=max(1, FILTER_CACHE_TABLES * self.dataset.count_rows()), weigh=len, name="arrow")
+        self._distinct = {}
+        seasons = self.dataset.to_table(columns=["season_num"]).column("season_num")
+        self.first_season = pc.min(seasons).as_py()
+        _registry[self.version] = self
+
+    def _distinct_values(self, column: str) -> list:
+        values = self.dataset.to_table(columns=[column]).column(column)
+        if pa.types.is_dictionary(values.type):
+            values = values.cast(values.type.value_type)
+        return pc.unique(values.drop_null()).to_pylist()
+
+    def _expression(self, key: tuple) -> ds.Expression:
+        _, y0, y1, disciplines, people = key
+        return (
+            ds.field("person").isin(sorted(people))
+            & ds.field("discipline").isin(sorted(disciplines))
+            & (ds.field("season_num") >= y0)
+            & (ds.field("season_num") <= y1)
+        )
+
+    def select(self, year_range: tuple[int, int], disciplines, people) -> pd.DataFrame:
+        key = (self.version, int(year_range[0]), int(year_range[1]), frozenset(disciplines), frozenset(people))
+        return self._memo.get_or_compute(key, lambda: self._build(key))
+
+    def _build(self, key: tuple) -> pd.DataFrame:
+        f = self.dataset.to_table(filter=self._expression(key)).to_pandas()
+        f.attrs[FILTER_KEY_ATTR] = key
+        f.attrs[FULL_HISTORY_ATTR] = bool(self.first_season is None or key[1] <= self.first_season)
+        return f
+
+    def group_agg(self, f: pd.DataFrame, keys: list[str], aggs: dict) -> pd.DataFrame:
+        columns = list(dict.fromkeys(keys + [c for c, _ in aggs.values()]))
+        table = _arrow_table(f, columns)
+        spec = [([], "count_all") if func == "size" else (col, func) for col, func in aggs.values()]
+        out = table.group_by(keys, use_threads=False).aggregate(spec).to_pandas()
+        names = ["count_all" if func == "size" else f"{col}_{func}" for col, func in aggs.values()]
+        return out.set_index(keys).rename(columns=dict(zip(names, aggs)))[list(aggs)]
+
+    def top_k(self, f: pd.DataFrame, by: list[str], order: list[tuple[str, bool]], k: int, notna=()) -> pd.DataFrame:
+        columns = list(dict.fromkeys(by + [c for c, _ in order] + list(notna)))
+        table = _arrow_table(f, columns)
+        valid = np.ones(len(f), dtype=bool)
+        for col in notna:
+            valid &= pc.is_valid(table.column(col)).to_numpy(zero_copy_only=False)
+        positions = np.flatnonzero(valid)
+        sort_keys = [(c, "ascending" if a else "descending") for c, a in order]
+        positions = positions[pc.sort_indices(table.take(positions), sort_keys=sort_keys).to_numpy()]
+
+        # rang de chaque ligne dans son groupe, dans l'ordre du tri ; les lignes sont prises dans f
+        codes = pd.factorize(row_keys(*(f[c].iloc[positions] for c in by)))[0]
+        ranked = np.argsort(codes, kind="stable")
+        starts = np.r_[0, np.flatnonzero(np.diff(codes[ranked])) + 1]
+        rank = np.empty(len(codes), dtype="int64")
+        rank[ranked] = np.arange(len(codes)) - np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+        return f.iloc[positions[rank < k]]
+
+
+@st.cache_resource
+def load_backend() -> PandasBackend:
+    name = os.environ.get(QUERY_BACKEND_ENV, QUERY_BACKEND)
+    if name == "arrow":
+        path = enriched_file()
+        if path is not None:
+            return ArrowBackend(path)
+    return PandasBackend(load_filter_index())
+
+
+# frame sans clé de filtre connue : calcul pandas
+_frame_backend = PandasBackend()
+
+
+def backend_for(f: pd.DataFrame) -> PandasBackend:
+    key = filter_key(f)
+    return _registry.get(key[0], _frame_backend) if key is not None else _frame_backend
+
+
+def group_agg(f: pd.DataFrame, keys: list[str], aggs: dict) -> pd.DataFrame:
+    unknown = {func for _, func in aggs.values()} - AGG_FUNCS
+    if unknown:
+        raise ValueError(f"Agrégats non supportés : {sorted(unknown)}")
+    return backend_for(f).group_agg(f, keys, aggs)
+
+
+def top_k(f: pd.DataFrame, by: list[str], order: list[tuple[str, bool]], k: int, notna=()) -> pd.DataFrame:
+    return backend_for(f).top_k(f, by, order, k, notna)
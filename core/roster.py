@@ -0,0 +1,59 @@
+"""
+Effectif suivi : fichier ROSTER_FILE (CSV, colonnes person et birthdate, plus
+name_raw optionnelle : le nom sur les feuilles de résultats) s'il existe, sinon
+PEOPLE, BIRTHDATES et SHEET_NAMES de core.config. L'ordre des lignes du fichier
+est l'ordre d'affichage dans les pages.
+"""
+import functools
+import os
+from typing import NamedTuple
+
+import pandas as pd
+
+from core.config import BIRTHDATES, PEOPLE, ROSTER_FILE, SHEET_NAMES
+
+
+class Roster(NamedTuple):
+    people: tuple[str, ...]
+    birthdates: dict
+    rank: dict
+    names: dict  # nom sur les feuilles -> personne
+
+
+def _make(people, birthdates: dict, names: dict) -> Roster:
+    people = tuple(dict.fromkeys(people))
+    return Roster(people, birthdates, {p: i for i, p in enumerate(people)}, names)
+
+
+@functools.lru_cache(maxsize=4)
+def _read(path: str, mtime_ns: int) -> Roster:
+    df = pd.read_csv(path, dtype=str)
+    df["person"] = df["person"].str.strip()
+    df = df[df["person"].notna() & (df["person"] != "")]
+    birth = df["birthdate"] if "birthdate" in df.columns else pd.Series(index=df.index, dtype=object)
+    birthdates = {p: b.strip() for p, b in zip(df["person"], birth) if isinstance(b, str) and b.strip()}
+    raw = df["name_raw"] if "name_raw" in df.columns else pd.Series(index=df.index, dtype=object)
+    names = {n.strip(): p for p, n in zip(df["person"], raw) if isinstance(n, str) and n.strip()}
+    return _make(df["person"], birthdates, names)
+
+
+def load_roster(path: str = ROSTER_FILE) -> Roster:
+    # relu seulement quand le fichier change (mtime)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return _make(PEOPLE, dict(BIRTHDATES), dict(SHEET_NAMES))
+    return _read(path, mtime_ns)
+
+
+def ordered(names) -> list[str]:
+    """`names` dans l'ordre de l'effectif (inconnus à la fin, par nom). Coût en O(len(names))."""
+    rank = load_roster().rank
+    return sorted(set(names), key=lambda p: (rank.get(p, len(rank)), str(p)))
+
+
+def age_now(person: str, today: pd.Timestamp) -> int | None:
+    birth_dt = pd.to_datetime(load_roster().birthdates.get(person), errors="coerce")
+    if pd.isna(birth_dt):
+        return None
+    return int(((today - birth_dt).days) // 365)
@@ -0,0 +1,136 @@
+"""
+Dataset partitionné (append_results) : aucune ligne perdue, et l'assemblage des
+partitions enrichies séparément (merge_partitions) donne la même table qu'un
+enrichissement complet. Feuilles exportées (ingest_sheets) : manifeste des
+sources, feuilles inchangées, modifiées ou supprimées.
+"""
+import pandas as pd
+import pyarrow.dataset as ds
+import pytest
+
+from benchmarks.synthetic import athlete_names, make_results
+from core.data import enrich_results, merge_partitions, read_results
+from core.ingest import COURSE_KEY, NULL_PARTITION, append_results, ingest_sheets, list_partitions
+
+ATHLETES = athlete_names(4)
+
+
+@pytest.fixture
+def raw():
+    return make_results(3_000, n_athletes=len(ATHLETES), n_seasons=6, seed=3)
+
+
+def _aligned(df: pd.DataFrame) -> pd.DataFrame:
+    # une ligne par (course, personne) chez les athlètes suivis
+    keys = pd.MultiIndex.from_frame(df[COURSE_KEY + ["person"]].astype(str))
+    return df.set_index(keys)[["course_order", "season_best", "running_record"]].sort_index()
+
+
+def test_rows_without_partition_keys_are_kept(raw, tmp_path):
+    raw.loc[raw.index[:3], "season"] = None
+    raw.loc[raw.index[3:5], "discipline"] = None
+    root = tmp_path / "dataset"
+
+    append_results(raw, root=str(root), seed=None)
+
+    assert any(NULL_PARTITION in str(p) for p in list_partitions(str(root)))
+    table = ds.dataset(root, format="parquet").to_table()
+    assert table.num_rows == len(raw)
+    assert table.column("season").null_count == 3
+    assert table.column("discipline").null_count == 2
+
+
+def test_merged_partitions_match_full_rebuild(raw, tmp_path):
+    root = tmp_path / "dataset"
+    # ajouts dans le désordre : saisons récentes d'abord
+    recent = raw["season"].astype(int) >= raw["season"].astype(int).median()
+    append_results(raw[recent], root=str(root), seed=None)
+    append_results(raw[~recent], root=str(root), seed=None)
+
+    parts = [enrich_results(read_results(str(pdir), people=ATHLETES)) for pdir in list_partitions(str(root))]
+    full = _aligned(enrich_results(read_results(str(root), people=ATHLETES)))
+
+    for ordered_parts in (parts, parts[::-1]):
+        merged = merge_partitions(ordered_parts)
+        assert merged["course_order"].is_monotonic_increasing
+        pd.testing.assert_frame_equal(_aligned(merged), full)
+
+
+# --- Feuilles exportées (ingest_sheets) ---
+
+HEADER = "Rang;Nom;Temps;Pts\n"
+
+
+def _sheet(src, rel: str, n: int, pts: float = 10.0) -> None:
+    path = src / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HEADER + "".join(f"{i + 1};NOM {i};4{i}.50;{pts + i}\n" for i in range(n)), encoding="utf-8")
+
+
+def _rows_by_pdf(out) -> dict:
+    return pd.read_parquet(out).groupby("pdf_file").size().to_dict()
+
+
+@pytest.fixture
+def sheets(tmp_path):
+    src, out = tmp_path / "feuilles", tmp_path / "results.parquet"
+    _sheet(src, "2024/2024_Les-Arcs_Flèche-1_Lucas.csv", 3)
+    # même saison et même discipline : les deux feuilles vont dans la même table
+    _sheet(src, "2024/2024_Les-Arcs_Flèche-2_Lucas.csv", 2)
+    _sheet(src, "2023_Tignes_Chamois-1_Léa.tsv", 4)
+    assert ingest_sheets(str(src), str(out), workers=1) == (3, 9)
+    return src, out
+
+
+def test_sheets_same_partition_are_both_kept(sheets):
+    _, out = sheets
+    assert _rows_by_pdf(out) == {
+        "2023_Tignes_Chamois-1_Léa.pdf": 4,
+        "2024_Les-Arcs_Flèche-1_Lucas.pdf": 3,
+        "2024_Les-Arcs_Flèche-2_Lucas.pdf": 2,
+    }
+
+
+def test_unchanged_sheets_are_skipped(sheets):
+    src, out = sheets
+    mtime = out.stat().st_mtime_ns
+    assert ingest_sheets(str(src), str(out), workers=1) == (0, 0)
+    assert out.stat().st_mtime_ns == mtime
+
+
+def test_changed_sheet_replaces_its_rows(sheets):
+    src, out = sheets
+    _sheet(src, "2024/2024_Les-Arcs_Flèche-1_Lucas.csv", 5, pts=20.0)
+
+    assert ingest_sheets(str(src), str(out), workers=1) == (1, 11)
+    rows = pd.read_parquet(out)
+    replaced = rows[rows["pdf_file"] == "2024_Les-Arcs_Flèche-1_Lucas.pdf"]
+    assert len(replaced) == 5 and replaced["pt_cse"].min() == 20.0
+    assert _rows_by_pdf(out)["2023_Tignes_Chamois-1_Léa.pdf"] == 4
+
+
+def test_removed_sheet_drops_its_rows(sheets):
+    src, out = sheets
+    (src / "2023_Tignes_Chamois-1_Léa.tsv").unlink()
+
+    assert ingest_sheets(str(src), str(out), workers=1) == (0, 5)
+    assert "2023_Tignes_Chamois-1_Léa.pdf" not in _rows_by_pdf(out)
+
+
+def test_sheet_with_own_pdf_file_is_replaced_not_duplicated(sheets):
+    src, out = sheets
+    own = src / "own.csv"
+    own.write_text("Rang;Nom;pdf_file\n1;NOM A;source.pdf\n2;NOM B;source.pdf\n", encoding="utf-8")
+    ingest_sheets(str(src), str(out), workers=1)
+    own.write_text("Rang;Nom;pdf_file\n1;NOM A;source.pdf\n", encoding="utf-8")
+    ingest_sheets(str(src), str(out), workers=1)
+
+    assert _rows_by_pdf(out)["source.pdf"] == 1
+
+
+def test_same_stem_in_two_folders_is_rejected(sheets):
+    src, out = sheets
+    _sheet(src, "autre/2023_Tignes_Chamois-1_Léa.csv", 1)
+
+    with pytest.raises(ValueError, match="même nom"):
+        ingest_sheets(str(src), str(out), workers=1)
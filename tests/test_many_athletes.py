@@ -0,0 +1,32 @@
+"""
+Rendu des deux pages avec un effectif élargi (Streamlit AppTest) : deux
+personnes aux compteurs identiques ne doivent pas produire deux éléments de
+même identifiant (StreamlitDuplicateElementId).
+"""
+import pytest
+
+from benchmarks.run import render_page
+from benchmarks.synthetic import athlete_names, make_results, write_results
+
+N_ATHLETES = 30
+
+
+@pytest.fixture(scope="module")
+def frame_path(tmp_path_factory):
+    from core.data import enrich_results, read_results
+    from core.filters import FilterIndex
+
+    tmp = tmp_path_factory.mktemp("many")
+    athletes = athlete_names(N_ATHLETES)
+    write_results(tmp / "results.parquet", make_results(3_000, n_athletes=N_ATHLETES, seed=1), sort_by=["person"])
+    df = enrich_results(read_results(str(tmp / "results.parquet"), people=athletes))
+    f = FilterIndex(df).select((0, 9999), ["Flèche", "Chamois"], athletes)
+
+    path = tmp / "filtered.pkl"
+    f.to_pickle(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("page", ["comparison", "evolution"])
+def test_pages_render_with_many_athletes(frame_path, page):
+    render_page(frame_path, page, timeout=300)
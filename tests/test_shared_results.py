@@ -0,0 +1,60 @@
+"""
+La table enrichie est chargée une fois et partagée entre sessions : load_data
+renvoie des vues sans copie, et aucune écriture dans une vue ne doit atteindre
+les autres.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+
+from benchmarks.synthetic import make_results, write_results
+
+
+@pytest.fixture
+def load_data(tmp_path, monkeypatch):
+    import core.cache
+    import core.data
+
+    write_results(str(tmp_path / "results.parquet"), make_results(2_000, seed=4), sort_by=["person"])
+    monkeypatch.setattr(core.data, "DATA_FILE", str(tmp_path / "results.parquet"))
+    monkeypatch.setattr(core.data, "DATASET_DIR", str(tmp_path / "results_dataset"))
+    monkeypatch.setattr(core.cache, "CACHE_DIR", str(tmp_path / ".cache"))
+    st.cache_resource.clear()
+    yield core.data.load_data
+    st.cache_resource.clear()
+
+
+def test_views_share_buffers(load_data):
+    view, other = load_data(), load_data()
+    assert view is not other
+    assert len(view) > 0
+    for col in ("pt_cse", "season_num", "course_order"):
+        assert np.shares_memory(view[col].to_numpy(), other[col].to_numpy())
+
+
+def test_view_writes_do_not_reach_other_views(load_data):
+    view, other = load_data(), load_data()
+    before = other.copy(deep=True)
+
+    view["pt_cse"] = 0.0
+    view.loc[view.index[0], "rank"] = -1
+    view.iloc[1, view.columns.get_loc("age_years")] = -1.0
+    view["nouvelle_colonne"] = 1
+
+    # écriture numpy brute : tableau en lecture seule sous copy-on-write
+    raw = view["season_num"].to_numpy()
+    with pytest.raises(ValueError):
+        raw[0] = 0
+
+    # la vue voit ses propres écritures...
+    assert (view["pt_cse"] == 0.0).all()
+    assert view["rank"].iloc[0] == -1
+    assert view["age_years"].iloc[1] == -1.0
+
+    # ...mais ni les autres vues ni les suivantes ne changent
+    pd.testing.assert_frame_equal(other, before)
+    fresh = load_data()
+    pd.testing.assert_frame_equal(fresh, before)
+    assert "nouvelle_colonne" not in fresh.columns
+    assert np.shares_memory(other["pt_cse"].to_numpy(), fresh["pt_cse"].to_numpy())